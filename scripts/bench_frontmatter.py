@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Startup and frontmatter-parsing benchmark for quick_validate.py.
+
+Measures, as fresh processes, the import time of quick_validate, yaml and
+package_skill, and the wall-clock time of a full `quick_validate.py` run.
+It then compares the built-in frontmatter parser with yaml.safe_load on
+every SKILL.md under the skills root.
+
+Usage:
+  ./scripts/bench_frontmatter.py
+  ./scripts/bench_frontmatter.py --runs 50 --skills-root skills
+"""
+import os
+import sys
+import time
+import argparse
+import statistics
+import subprocess
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCRIPTS_DIR = os.path.join(PROJECT_ROOT, "skills", "skill-creator", "scripts")
+sys.path.insert(0, SCRIPTS_DIR)
+
+import quick_validate  # noqa: E402
+
+
+def time_process(argv, runs):
+    """Median and minimum wall-clock seconds of running argv as a fresh process."""
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(argv, cwd=SCRIPTS_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        times.append(time.perf_counter() - start)
+    return statistics.median(times), min(times)
+
+
+def time_calls(func, items, runs):
+    best = float("inf")
+    for _ in range(runs):
+        start = time.perf_counter()
+        for item in items:
+            func(item)
+        best = min(best, time.perf_counter() - start)
+    return best / max(1, len(items))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark quick_validate.py startup and frontmatter parsing")
+    parser.add_argument("--runs", "-n", type=int, default=20, help="Repetitions per measurement (default: 20)")
+    parser.add_argument("--skills-root", default=os.path.join(PROJECT_ROOT, "skills"),
+                        help="Directory of skills to validate (default: ./skills)")
+    args = parser.parse_args()
+
+    skills = sorted(os.path.join(args.skills_root, d) for d in os.listdir(args.skills_root)
+                    if os.path.isfile(os.path.join(args.skills_root, d, "SKILL.md")))
+    sample = os.path.abspath(skills[0])
+
+    print(f"Process startup ({args.runs} runs, median / min):")
+    cases = [
+        ("python3 (no imports)", [sys.executable, "-c", "pass"]),
+        ("import yaml", [sys.executable, "-c", "import yaml"]),
+        ("import quick_validate", [sys.executable, "-c", "import quick_validate"]),
+        ("import package_skill", [sys.executable, "-c", "import package_skill"]),
+        (f"quick_validate.py {os.path.basename(sample)}", [sys.executable, "quick_validate.py", sample]),
+    ]
+    for label, argv in cases:
+        median, best = time_process(argv, args.runs)
+        print(f"  {label:<36} {median * 1000:7.1f} ms / {best * 1000:7.1f} ms")
+
+    print(f"\nyaml imported by quick_validate: {'yaml' in sys.modules}")
+
+    texts = []
+    for skill in skills:
+        text, error = quick_validate.read_frontmatter(os.path.join(skill, "SKILL.md"))
+        if text is not None:
+            texts.append(text)
+
+    def builtin(text):
+        try:
+            quick_validate.parse_simple_frontmatter(text)
+        except (quick_validate.NeedsYaml, quick_validate.FrontmatterError):
+            pass
+
+    try:
+        import yaml
+    except ImportError:
+        yaml = None
+
+    print(f"\nFrontmatter parsing ({len(texts)} SKILL.md files, per file):")
+    print(f"  {'built-in parser':<36} {time_calls(builtin, texts, args.runs) * 1e6:9.1f} us")
+    if yaml:
+        def pyyaml(text):
+            try:
+                yaml.safe_load(text)
+            except yaml.YAMLError:
+                pass
+        print(f"  {'yaml.safe_load':<36} {time_calls(pyyaml, texts, args.runs) * 1e6:9.1f} us")
+    print(f"  {'validate_skill (end to end)':<36} "
+          f"{time_calls(quick_validate.validate_skill, skills, args.runs) * 1e6:9.1f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""
+Offline latency benchmark for the nix skill scripts.
+
+Starts local stand-ins for the search.nixos.org Elasticsearch `_search`
+endpoint and the GitHub contents/raw endpoints, points search_nixos.py and
+nixpkgs_source.py at them through their environment overrides, and runs
+each CLI mode as a fresh process. Reports cold-start time (`--help`),
+per-call latency percentiles and bytes served per call.
+
+Usage:
+  ./scripts/bench_nix_scripts.py
+  ./scripts/bench_nix_scripts.py --latency 80 --runs 20
+  ./scripts/bench_nix_scripts.py --file-lines 200000 --mode source-range
+"""
+import os
+import sys
+import json
+import time
+import socket
+import argparse
+import tempfile
+import threading
+import subprocess
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCRIPTS_DIR = os.path.join(PROJECT_ROOT, "skills", "nix", "scripts")
+SEARCH = os.path.join(SCRIPTS_DIR, "search_nixos.py")
+SOURCE = os.path.join(SCRIPTS_DIR, "nixpkgs_source.py")
+
+# (name, script, arguments)
+MODES = [
+    ("search-packages", SEARCH, ["hello"]),
+    ("search-options", SEARCH, ["-t", "options", "nginx"]),
+    ("search-prefix", SEARCH, ["--prefix", "services.nginx", "-n", "200"]),
+    ("search-ndjson", SEARCH, ["--ndjson", "--prefix", "services.nginx", "-n", "200"]),
+    ("search-json", SEARCH, ["--json", "hello"]),
+    ("search-with-source", SEARCH, ["--with-source", "-n", "5", "hello"]),
+    ("search-all-channels", SEARCH, ["--channel", "all", "hello"]),
+    ("source-file", SOURCE, ["pkgs/by-name/he/hello/package.nix"]),
+    ("source-range", SOURCE, ["pkgs/top-level/all-packages.nix:100-140"]),
+    ("source-list", SOURCE, ["pkgs/by-name/he/hello"]),
+    ("source-batch", SOURCE, [f"pkgs/by-name/he/hello/file{i}.nix" for i in range(5)]),
+]
+
+
+class Backend:
+    """Shared configuration and byte counters for the stand-in servers."""
+
+    def __init__(self, latency, hits, description_bytes, file_lines, dir_entries):
+        self.latency = latency
+        self.hits = hits
+        self.description_bytes = description_bytes
+        self.file_lines = file_lines
+        self.dir_entries = dir_entries
+        self.lock = threading.Lock()
+        self.bytes_sent = 0
+        self.requests = 0
+
+    def count(self, n):
+        with self.lock:
+            self.bytes_sent += n
+
+    def reset(self):
+        with self.lock:
+            sent, requests = self.bytes_sent, self.requests
+            self.bytes_sent = self.requests = 0
+        return sent, requests
+
+    def search_response(self, body):
+        """A `_search` response shaped like search.nixos.org's."""
+        query = json.loads(body or b"{}")
+        size = min(query.get("size", 20), self.hits)
+        filters = query.get("query", {}).get("bool", {}).get("filter", [])
+        is_option = any(f.get("term", {}).get("type") == "option" for f in filters)
+        filler = ("lorem ipsum " * (self.description_bytes // 12 + 1))[:self.description_bytes]
+        hits = []
+        for i in range(size):
+            if is_option:
+                source = {
+                    "type": "option",
+                    "option_name": f"services.bench.option{i}",
+                    "option_type": "boolean",
+                    "option_default": "false",
+                    "option_source": "nixos/modules/services/bench.nix",
+                    "option_description": f"<rendered-html><p>Whether to enable <code>bench{i}</code> &amp; {filler}</p></rendered-html>",
+                }
+            else:
+                source = {
+                    "type": "package",
+                    "package_attr_name": f"bench{i}",
+                    "package_pname": f"bench{i}",
+                    "package_pversion": "1.0",
+                    "package_description": filler,
+                    "package_position": f"pkgs/by-name/be/bench{i}/package.nix:{10 + i}",
+                    "package_programs": [f"bench{i}"],
+                    "package_homepage": ["https://example.org"],
+                    "package_license": [{"fullName": "MIT License"}],
+                }
+            hits.append({"_index": "bench", "_id": str(i), "_score": 1.0, "_source": source})
+        return {"hits": {"total": {"value": self.hits}, "hits": hits}}
+
+    def listing_response(self, path):
+        entries = [{"name": f"dir{i}", "type": "dir", "size": 0} for i in range(self.dir_entries // 4)]
+        entries += [{"name": f"file{i}.nix", "type": "file", "size": 1000 + i, "path": f"{path}/file{i}.nix"}
+                    for i in range(self.dir_entries - len(entries))]
+        return entries
+
+
+def make_handler(backend):
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def setup(self):
+            super().setup()
+            # Keep kernel buffering small so bytes_sent tracks what clients actually read
+            self.connection.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, 16384)
+
+        def respond(self, status, body, content_type, headers=()):
+            time.sleep(backend.latency)
+            with backend.lock:
+                backend.requests += 1
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            for name, value in headers:
+                self.send_header(name, value)
+            self.end_headers()
+            try:
+                for i in range(0, len(body), 8192):
+                    chunk = body[i:i + 8192]
+                    self.wfile.write(chunk)
+                    backend.count(len(chunk))
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length", 0))
+            body = self.rfile.read(length)
+            if not self.path.endswith("/_search"):
+                self.respond(404, b"{}", "application/json")
+                return
+            data = json.dumps(backend.search_response(body)).encode("utf-8")
+            self.respond(200, data, "application/json")
+
+        def do_GET(self):
+            url = urllib.parse.urlsplit(self.path)
+            if url.path.startswith("/api/"):
+                path = url.path[len("/api/"):]
+                data = json.dumps(backend.listing_response(path)).encode("utf-8")
+                etag = f'"{hash(path) & 0xffffffff:x}"'
+                limit = [("ETag", etag), ("X-RateLimit-Remaining", "4999"),
+                         ("X-RateLimit-Reset", str(int(time.time()) + 3600))]
+                if self.headers.get("If-None-Match") == etag:
+                    self.respond(304, b"", "application/json", limit)
+                else:
+                    self.respond(200, data, "application/json", limit)
+            elif url.path.startswith("/raw/"):
+                lines = "".join(f"  bench-line-{i} = callPackage ./pkg{i} {{ }};\n" for i in range(1, backend.file_lines + 1))
+                self.respond(200, lines.encode("utf-8"), "text/plain; charset=utf-8")
+            else:
+                self.respond(404, b"Not Found", "text/plain")
+
+    return Handler
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile."""
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def run_once(script, arguments, env):
+    start = time.perf_counter()
+    proc = subprocess.run([sys.executable, script] + arguments, env=env,
+                          stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    elapsed = time.perf_counter() - start
+    if proc.returncode != 0:
+        raise RuntimeError(f"{os.path.basename(script)} {' '.join(arguments)} failed:\n{proc.stderr.decode()}")
+    return elapsed, len(proc.stdout)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the nix skill scripts against local stand-in servers")
+    parser.add_argument("--latency", type=float, default=50, help="Added server latency per request in ms (default: 50)")
+    parser.add_argument("--runs", "-n", type=int, default=10, help="Runs per mode (default: 10)")
+    parser.add_argument("--hits", type=int, default=200, help="Hits available per search (default: 200)")
+    parser.add_argument("--description-bytes", type=int, default=400, help="Description size per hit (default: 400)")
+    parser.add_argument("--file-lines", type=int, default=20000, help="Lines per raw file (default: 20000)")
+    parser.add_argument("--dir-entries", type=int, default=100, help="Entries per directory listing (default: 100)")
+    parser.add_argument("--mode", "-m", action="append", choices=[m[0] for m in MODES],
+                        help="Only run the given mode(s)")
+    parser.add_argument("--json", "-j", action="store_true", help="Output results as JSON")
+    args = parser.parse_args()
+
+    backend = Backend(args.latency / 1000, args.hits, args.description_bytes, args.file_lines, args.dir_entries)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(backend))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_port}"
+
+    with tempfile.TemporaryDirectory() as cache:
+        env = dict(os.environ,
+                   NIXOS_SEARCH_API=f"{base}/backend",
+                   NIXPKGS_GITHUB_API=f"{base}/api",
+                   NIXPKGS_GITHUB_RAW=f"{base}/raw",
+                   XDG_CACHE_HOME=cache)
+        env.pop("GITHUB_TOKEN", None)
+        env.pop("GH_TOKEN", None)
+
+        report = {"config": vars(args), "cold_start": {}, "modes": {}}
+        for script in (SEARCH, SOURCE):
+            times = [run_once(script, ["--help"], env)[0] for _ in range(args.runs)]
+            report["cold_start"][os.path.basename(script)] = {
+                "p50_ms": percentile(times, 50) * 1000,
+                "min_ms": min(times) * 1000,
+            }
+
+        for name, script, arguments in MODES:
+            if args.mode and name not in args.mode:
+                continue
+            backend.reset()
+            times = []
+            output = 0
+            for _ in range(args.runs):
+                elapsed, out_bytes = run_once(script, arguments, env)
+                times.append(elapsed)
+                output += out_bytes
+            sent, requests = backend.reset()
+            report["modes"][name] = {
+                "p50_ms": percentile(times, 50) * 1000,
+                "p90_ms": percentile(times, 90) * 1000,
+                "p99_ms": percentile(times, 99) * 1000,
+                "requests_per_call": requests / args.runs,
+                "bytes_per_call": sent // args.runs,
+                "output_bytes_per_call": output // args.runs,
+            }
+
+    server.shutdown()
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    print(f"Stand-in latency {args.latency:g} ms, {args.runs} runs per mode\n")
+    print("Cold start (--help):")
+    for script, stats in report["cold_start"].items():
+        print(f"  {script:<20} p50 {stats['p50_ms']:8.1f} ms   min {stats['min_ms']:8.1f} ms")
+    print()
+    print(f"  {'mode':<22} {'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8} {'reqs':>5} {'served':>10} {'output':>10}")
+    for name, stats in report["modes"].items():
+        print(f"  {name:<22} {stats['p50_ms']:8.1f} {stats['p90_ms']:8.1f} {stats['p99_ms']:8.1f} "
+              f"{stats['requests_per_call']:5.1f} {stats['bytes_per_call']:10,} {stats['output_bytes_per_call']:10,}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark for search_nixos.py option rendering.
+
+Compares strip_html against the original regex-chain implementation and
+times full format_option / NDJSON rendering.
+
+Usage:
+  # Synthetic corpus shaped like real option descriptions
+  ./scripts/bench_strip_html.py
+
+  # Real descriptions from search.nixos.org (needs network)
+  ./scripts/bench_strip_html.py --fetch services --count 3000
+
+  # Real descriptions from a saved `search_nixos.py --json` dump
+  ./scripts/bench_strip_html.py --input options.json
+"""
+import os
+import re
+import sys
+import io
+import json
+import time
+import random
+import argparse
+import textwrap
+
+SCRIPTS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "skills", "nix", "scripts")
+sys.path.insert(0, SCRIPTS_DIR)
+
+import search_nixos  # noqa: E402
+
+
+def legacy_strip_html(text):
+    """The original strip_html (one re.sub per step), for comparison."""
+    if not text:
+        return ""
+    text = re.sub(r'</?rendered-html>', '', text)
+    text = re.sub(r'<code[^>]*>(.*?)</code>', r'`\1`', text)
+    text = re.sub(r'<pre><code>(.*?)</code></pre>', lambda m: '\n' + textwrap.indent(m.group(1), '    '), text, flags=re.DOTALL)
+    text = re.sub(r'<[^>]+>', '', text)
+    text = text.replace('&lt;', '<').replace('&gt;', '>').replace('&amp;', '&').replace('&quot;', '"')
+    text = re.sub(r'\n{3,}', '\n\n', text)
+    return text.strip()
+
+
+SENTENCES = [
+    "Whether to enable the {name} service.",
+    "The package to use for {name}.",
+    "Additional command line arguments passed to <code>{name}</code>.",
+    "Path to the configuration file. See <a href=\"https://example.org/{name}\">the upstream docs</a> for details.",
+    "If set, the value of <code>services.{name}.settings</code> is ignored &amp; the file is used as-is.",
+    "Values must be &lt;= 65535 and are written to <code>/etc/{name}.conf</code>.",
+    "This option is &quot;experimental&quot; and may change without notice.",
+]
+CODE_BLOCK = "<pre><code class=\"language-nix\">{{\n  services.{name}.enable = true;\n  services.{name}.settings = {{ port = 8080; }};\n}}\n</code></pre>"
+
+
+def synthetic_hits(count, seed=0):
+    """Option hits whose descriptions mimic the HTML that search.nixos.org returns."""
+    rng = random.Random(seed)
+    hits = []
+    for i in range(count):
+        name = f"svc{i}"
+        paras = []
+        for _ in range(rng.randint(1, 4)):
+            para = " ".join(s.format(name=name) for s in rng.sample(SENTENCES, rng.randint(1, 4)))
+            paras.append(f"<p>{para}</p>")
+        if rng.random() < 0.3:
+            paras.append(CODE_BLOCK.format(name=name))
+        hits.append({"_source": {
+            "option_name": f"services.{name}.enable",
+            "option_type": "boolean",
+            "option_default": "false",
+            "option_description": "<rendered-html>" + "\n".join(paras) + "</rendered-html>",
+        }})
+    return hits
+
+
+def load_hits(path):
+    """Read hits from a search_nixos.py --json dump or a file of JSON lines."""
+    with open(path, "r", encoding="utf-8") as f:
+        text = f.read()
+    try:
+        data = json.loads(text)
+        return data.get("hits", {}).get("hits", [])
+    except ValueError:
+        return [json.loads(line) for line in text.splitlines() if line.strip()]
+
+
+def bench(label, func, items, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for item in items:
+            func(item)
+        best = min(best, time.perf_counter() - start)
+    per_item = best / max(1, len(items)) * 1e6
+    print(f"  {label:<28} {best * 1000:9.2f} ms   {per_item:7.2f} us/item")
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark search_nixos.py option rendering")
+    parser.add_argument("--input", "-i", help="search_nixos.py --json dump (or JSON lines of hits)")
+    parser.add_argument("--fetch", metavar="PREFIX", help="Fetch real options under PREFIX from search.nixos.org")
+    parser.add_argument("--count", "-n", type=int, default=3000, help="Number of options (default: 3000)")
+    parser.add_argument("--repeat", "-r", type=int, default=5, help="Timing repetitions, best is reported (default: 5)")
+    args = parser.parse_args()
+
+    if args.input:
+        hits = load_hits(args.input)
+        corpus = args.input
+    elif args.fetch:
+        results = search_nixos.search(args.fetch, "options-prefix", size=args.count)
+        if not results:
+            sys.exit(1)
+        hits = results.get("hits", {}).get("hits", [])
+        corpus = f"search.nixos.org options under {args.fetch}"
+    else:
+        hits = synthetic_hits(args.count)
+        corpus = "synthetic"
+
+    descriptions = [hit["_source"].get("option_description", "") for hit in hits]
+    total_bytes = sum(len(d) for d in descriptions)
+    print(f"{len(descriptions)} option descriptions ({total_bytes:,} bytes, {corpus})\n")
+
+    print("strip_html:")
+    legacy = bench("legacy", legacy_strip_html, descriptions, args.repeat)
+    current = bench("current", search_nixos.strip_html, descriptions, args.repeat)
+    print(f"  speedup: {legacy / current:.2f}x\n")
+
+    print("rendering:")
+    sink = io.StringIO()
+    bench("format_option", search_nixos.format_option, hits, args.repeat)
+    bench("ndjson", lambda hit: search_nixos.write_ndjson(search_nixos.option_record(hit), sink), hits, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for an OTLP/HTTP trace collector.
+
+Accepts OTLP JSON on /v1/traces and prints each trace as an indented span
+tree with durations, so the tracing in the repository's scripts can be
+checked without a real collector. Optionally appends the raw requests to a
+JSON lines file.
+
+Usage:
+  ./scripts/otlp_collector.py --port 4318 &
+  OTEL_EXPORTER_OTLP_ENDPOINT=http://127.0.0.1:4318 PYTHONPATH=scripts ./skills/nix/scripts/search_nixos.py hello
+"""
+import sys
+import json
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+lock = threading.Lock()
+
+
+def value_of(attribute):
+    value = next(iter(attribute["value"].values()))
+    if isinstance(value, dict):
+        return ",".join(str(value_of({"value": v})) for v in value.get("values", []))
+    return value
+
+
+def print_spans(payload, out=sys.stdout):
+    """Print the spans of one export request as trees, children under their parents."""
+    for resource_spans in payload.get("resourceSpans", []):
+        attributes = {a["key"]: value_of(a)
+                      for a in resource_spans.get("resource", {}).get("attributes", [])}
+        spans = [span for scope in resource_spans.get("scopeSpans", []) for span in scope.get("spans", [])]
+        ids = {span["spanId"] for span in spans}
+        children = {}
+        for span in spans:
+            parent = span.get("parentSpanId") if span.get("parentSpanId") in ids else None
+            children.setdefault(parent, []).append(span)
+
+        def walk(parent, depth):
+            for span in sorted(children.get(parent, []), key=lambda s: int(s["startTimeUnixNano"])):
+                duration = (int(span["endTimeUnixNano"]) - int(span["startTimeUnixNano"])) / 1e6
+                status = " ERROR " + span["status"].get("message", "") if span.get("status", {}).get("code") == 2 else ""
+                attrs = " ".join(f"{a['key']}={value_of(a)}" for a in span.get("attributes", []))
+                print(f"  {'  ' * depth}{span['name']:<{40 - 2 * depth}} {duration:10.2f} ms  {attrs}{status}", file=out)
+                walk(span["spanId"], depth + 1)
+
+        print(f"{attributes.get('service.name', '?')} (pid {attributes.get('process.pid', '?')}): {len(spans)} spans", file=out)
+        walk(None, 0)
+    out.flush()
+
+
+def make_handler(output):
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            if self.path.rstrip("/") != "/v1/traces":
+                self.send_response(404)
+                self.end_headers()
+                return
+            try:
+                payload = json.loads(body)
+            except ValueError:
+                self.send_response(400)
+                self.end_headers()
+                return
+            with lock:
+                print_spans(payload)
+                if output:
+                    with open(output, "a", encoding="utf-8") as f:
+                        f.write(json.dumps(payload) + "\n")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", "2")
+            self.end_headers()
+            self.wfile.write(b"{}")
+
+    return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Print OTLP/HTTP JSON traces sent to /v1/traces")
+    parser.add_argument("--host", default="127.0.0.1", help="Address to listen on (default: 127.0.0.1)")
+    parser.add_argument("--port", "-p", type=int, default=4318, help="Port to listen on (default: 4318)")
+    parser.add_argument("--output", "-o", help="Also append every export request to this JSON lines file")
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(args.output))
+    print(f"Listening for OTLP/HTTP traces on http://{args.host}:{server.server_port}/v1/traces", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
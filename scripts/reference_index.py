@@ -0,0 +1,309 @@
+#!/usr/bin/env python3
+"""
+Full-text search over the synced skill references.
+
+Splits every markdown file under skills/*/references into heading-level
+sections and keeps them in a SQLite FTS5 index. `update` re-indexes only
+files whose content hash changed since the last run (sync_resources.py runs
+it after every sync); `search` returns ranked section snippets with their
+paths and line numbers.
+
+Usage:
+  ./scripts/reference_index.py update
+  ./scripts/reference_index.py search "hysteria2 obfs"
+  ./scripts/reference_index.py search --skill nix "buildGoModule vendorHash" -n 5
+  ./scripts/reference_index.py search --json 'tail_sampling AND policies'
+"""
+import os
+import re
+import sys
+import json
+import sqlite3
+import hashlib
+import argparse
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SKILLS_DIR = os.path.join(PROJECT_ROOT, "skills")
+DEFAULT_DB = os.path.join(PROJECT_ROOT, ".cache", "references.sqlite")
+SCHEMA_VERSION = 1
+
+MARKDOWN_SUFFIXES = (".md", ".mdx", ".markdown")
+HEADING_RE = re.compile(rb'^(#{1,6})[ \t]+(.*?)(?:[ \t]+#+)?[ \t]*$')
+FENCE_RE = re.compile(rb'^[ \t]{0,3}(`{3,}|~{3,})')
+TITLE_RE = re.compile(rb'^title:[ \t]*["\']?(.*?)["\']?[ \t]*$', re.MULTILINE)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    skill TEXT NOT NULL,
+    sha256 TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS sections (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL,
+    skill TEXT NOT NULL,
+    heading TEXT NOT NULL,
+    line INTEGER NOT NULL,
+    body TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS sections_path ON sections(path);
+CREATE VIRTUAL TABLE IF NOT EXISTS sections_fts USING fts5(
+    heading, body, content='sections', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+);
+CREATE TRIGGER IF NOT EXISTS sections_ai AFTER INSERT ON sections BEGIN
+    INSERT INTO sections_fts(rowid, heading, body) VALUES (new.id, new.heading, new.body);
+END;
+CREATE TRIGGER IF NOT EXISTS sections_ad AFTER DELETE ON sections BEGIN
+    INSERT INTO sections_fts(sections_fts, rowid, heading, body) VALUES ('delete', old.id, old.heading, old.body);
+END;
+"""
+
+
+def split_sections(data, fallback_title=""):
+    """
+    Split markdown at ATX headings, ignoring `#` lines inside fenced code.
+
+    Returns:
+        list of dicts with level, title, heading_path (list of titles from the
+        top of the document), line (1-based), start and end (byte offsets)
+    """
+    sections = []
+    stack = []
+    offset = 0
+    fence = None
+    lines = data.splitlines(keepends=True)
+
+    # Front matter: skip it, but use its title for text before the first heading
+    if lines and lines[0].rstrip() == b"---":
+        for i in range(1, len(lines)):
+            if lines[i].rstrip() in (b"---", b"..."):
+                front = b"".join(lines[:i + 1])
+                match = TITLE_RE.search(front)
+                if match and match.group(1).strip():
+                    fallback_title = match.group(1).decode("utf-8", "replace")
+                offset = len(front)
+                lines = lines[i + 1:]
+                break
+    first_line = data.count(b"\n", 0, offset) + 1
+
+    current = {"level": 0, "title": fallback_title, "heading_path": [fallback_title] if fallback_title else [],
+               "line": first_line, "start": offset}
+    for number, raw in enumerate(lines, first_line):
+        line = raw.rstrip(b"\r\n")
+        match = FENCE_RE.match(line)
+        if match:
+            marker = match.group(1)
+            if fence is None:
+                fence = marker
+            elif marker[:1] == fence[:1] and len(marker) >= len(fence):
+                fence = None
+        elif fence is None:
+            match = HEADING_RE.match(line)
+            if match:
+                current["end"] = offset
+                sections.append(current)
+                level = len(match.group(1))
+                title = match.group(2).decode("utf-8", "replace").strip()
+                while stack and stack[-1][0] >= level:
+                    stack.pop()
+                stack.append((level, title))
+                current = {"level": level, "title": title, "heading_path": [t for _, t in stack],
+                           "line": number, "start": offset}
+        offset += len(raw)
+    current["end"] = offset
+    sections.append(current)
+
+    # Drop an empty preamble (nothing but whitespace before the first heading)
+    if sections[0]["level"] == 0 and not data[sections[0]["start"]:sections[0]["end"]].strip():
+        sections.pop(0)
+    return sections
+
+
+def find_references(skills_dir=SKILLS_DIR):
+    """Return {relpath: (skill, abspath)} for every markdown file under skills/*/references."""
+    found = {}
+    if not os.path.isdir(skills_dir):
+        return found
+    for skill in sorted(os.listdir(skills_dir)):
+        references = os.path.join(skills_dir, skill, "references")
+        if not os.path.isdir(references):
+            continue
+        for dirpath, dirnames, filenames in os.walk(references):
+            dirnames[:] = [d for d in dirnames if not d.startswith(".")]
+            for name in filenames:
+                if name.lower().endswith(MARKDOWN_SUFFIXES):
+                    path = os.path.join(dirpath, name)
+                    found[os.path.relpath(path, skills_dir).replace(os.sep, "/")] = (skill, path)
+    return found
+
+
+def connect(db_path=DEFAULT_DB):
+    os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+    db = sqlite3.connect(db_path)
+    db.execute("PRAGMA journal_mode=WAL")
+    db.execute("PRAGMA synchronous=NORMAL")
+    db.executescript(SCHEMA)
+    row = db.execute("SELECT value FROM meta WHERE key = 'schema_version'").fetchone()
+    if row is None or int(row[0]) != SCHEMA_VERSION:
+        db.executescript("DELETE FROM sections; DELETE FROM files;")
+        db.execute("INSERT OR REPLACE INTO meta VALUES ('schema_version', ?)", (str(SCHEMA_VERSION),))
+        db.commit()
+    return db
+
+
+def update_index(db_path=DEFAULT_DB, skills_dir=SKILLS_DIR, full=False):
+    """
+    Bring the index in line with the reference files on disk.
+
+    Files whose size and mtime are unchanged are skipped without reading
+    them; otherwise the content hash decides whether they are re-indexed.
+
+    Returns:
+        dict with counts of added, updated, removed, unchanged files and sections written
+    """
+    stats = {"added": 0, "updated": 0, "removed": 0, "unchanged": 0, "sections": 0}
+    db = connect(db_path)
+    try:
+        if full:
+            db.executescript("DELETE FROM sections; DELETE FROM files;")
+        known = {path: (sha, size, mtime) for path, sha, size, mtime
+                 in db.execute("SELECT path, sha256, size, mtime_ns FROM files")}
+        current = find_references(skills_dir)
+
+        with db:
+            for path in known.keys() - current.keys():
+                db.execute("DELETE FROM sections WHERE path = ?", (path,))
+                db.execute("DELETE FROM files WHERE path = ?", (path,))
+                stats["removed"] += 1
+
+            for path, (skill, abspath) in sorted(current.items()):
+                st = os.stat(abspath)
+                previous = known.get(path)
+                if previous and previous[1:] == (st.st_size, st.st_mtime_ns):
+                    stats["unchanged"] += 1
+                    continue
+
+                with open(abspath, "rb") as f:
+                    data = f.read()
+                sha = hashlib.sha256(data).hexdigest()
+                if previous and previous[0] == sha:
+                    db.execute("UPDATE files SET size = ?, mtime_ns = ? WHERE path = ?",
+                               (st.st_size, st.st_mtime_ns, path))
+                    stats["unchanged"] += 1
+                    continue
+
+                if previous:
+                    db.execute("DELETE FROM sections WHERE path = ?", (path,))
+                    stats["updated"] += 1
+                else:
+                    stats["added"] += 1
+
+                stem = os.path.splitext(os.path.basename(path))[0]
+                rows = []
+                for section in split_sections(data, stem):
+                    body = data[section["start"]:section["end"]].decode("utf-8", "replace")
+                    rows.append((path, skill, " > ".join(section["heading_path"]), section["line"], body))
+                db.executemany("INSERT INTO sections (path, skill, heading, line, body) VALUES (?, ?, ?, ?, ?)", rows)
+                db.execute("INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?)",
+                           (path, skill, sha, st.st_size, st.st_mtime_ns))
+                stats["sections"] += len(rows)
+
+        if stats["added"] or stats["updated"] or stats["removed"]:
+            db.execute("INSERT INTO sections_fts(sections_fts) VALUES ('optimize')")
+            db.commit()
+    finally:
+        db.close()
+    return stats
+
+
+def quote_terms(query):
+    """Turn free text into an FTS5 query that ANDs every word as a literal."""
+    terms = re.findall(r'\w+', query, re.UNICODE)
+    return " ".join('"' + term + '"' for term in terms)
+
+
+def search(query, db_path=DEFAULT_DB, skill=None, limit=10, snippet_tokens=24):
+    """
+    Ranked sections matching an FTS5 query (free text falls back to ANDed words).
+
+    Returns:
+        list of dicts with path, skill, heading, line, snippet and score
+    """
+    if not os.path.exists(db_path):
+        raise FileNotFoundError(f"No reference index at {db_path}; run `reference_index.py update` first")
+
+    db = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    sql = ("SELECT s.path, s.skill, s.heading, s.line, "
+           "snippet(sections_fts, 1, '[', ']', ' … ', ?), bm25(sections_fts, 4.0, 1.0) AS score "
+           "FROM sections_fts JOIN sections s ON s.id = sections_fts.rowid "
+           "WHERE sections_fts MATCH ?" + (" AND s.skill = ?" if skill else "") +
+           " ORDER BY score LIMIT ?")
+    try:
+        for match in (query, quote_terms(query)):
+            if not match:
+                continue
+            params = [snippet_tokens, match] + ([skill] if skill else []) + [limit]
+            try:
+                rows = db.execute(sql, params).fetchall()
+            except sqlite3.OperationalError:
+                # Not valid FTS5 syntax: retry as plain words
+                continue
+            return [{"path": path, "skill": skill_name, "heading": heading, "line": line,
+                     "snippet": " ".join(snippet.split()), "score": round(-score, 3)}
+                    for path, skill_name, heading, line, snippet, score in rows]
+        return []
+    finally:
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Full-text search over skills/*/references",
+        epilog="""Examples:
+  reference_index.py update
+  reference_index.py search "hysteria2 obfs"
+  reference_index.py search --skill nix 'buildGoModule AND vendorHash'""",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("--db", default=DEFAULT_DB, help=f"Index location (default: {os.path.relpath(DEFAULT_DB, PROJECT_ROOT)})")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    update = commands.add_parser("update", help="Index new and changed reference files")
+    update.add_argument("--full", action="store_true", help="Rebuild the index from scratch")
+
+    find = commands.add_parser("search", help="Search the index")
+    find.add_argument("query", help="Words to search for, or an FTS5 query (AND/OR/NOT, \"phrases\", prefix*)")
+    find.add_argument("--skill", "-s", help="Only search this skill's references")
+    find.add_argument("--limit", "-n", type=int, default=10, help="Number of results (default: 10)")
+    find.add_argument("--json", "-j", action="store_true", help="Output results as JSON lines")
+    args = parser.parse_args()
+
+    if args.command == "update":
+        stats = update_index(args.db, full=args.full)
+        print(f"Indexed references: {stats['added']} added, {stats['updated']} updated, "
+              f"{stats['removed']} removed, {stats['unchanged']} unchanged ({stats['sections']} sections written)")
+        return
+
+    try:
+        results = search(args.query, args.db, skill=args.skill, limit=args.limit)
+    except FileNotFoundError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    if args.json:
+        for result in results:
+            print(json.dumps(result, ensure_ascii=False))
+        return
+    if not results:
+        print("No matches.")
+        return
+    for result in results:
+        print(f"skills/{result['path']}:{result['line']}  {result['heading']}")
+        print(f"    {result['snippet']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+Section-level table of contents for the synced skill references.
+
+`build` splits every markdown file under skills/<skill>/references at its
+headings and writes skills/<skill>/references/toc.json, mapping each
+section ID to its file, line, byte offset, length and an approximate token
+count. Files whose content is unchanged keep their previous entries.
+`get` reads a single section with one seek, so a subsection of a large
+manual can be loaded without reading the whole file.
+
+Section IDs are `<file>#<heading-slug>/<subheading-slug>`, relative to the
+references directory, e.g. `manual/languages-frameworks/go.section.md#go/buildgomodule`;
+text before a file's first heading is `<file>#_preamble`.
+
+Usage:
+  ./scripts/reference_toc.py build
+  ./scripts/reference_toc.py list nix manual/languages-frameworks/go
+  ./scripts/reference_toc.py get nix 'manual/languages-frameworks/go.section.md#go/buildgomodule'
+"""
+import os
+import re
+import sys
+import json
+import hashlib
+import argparse
+
+from reference_index import SKILLS_DIR, MARKDOWN_SUFFIXES, split_sections
+
+TOC_FILENAME = "toc.json"
+TOC_VERSION = 1
+CHARS_PER_TOKEN = 4
+PREAMBLE_ID = "_preamble"
+SLUG_RE = re.compile(r'[^\w-]+', re.UNICODE)
+
+
+def slugify(title):
+    slug = SLUG_RE.sub("-", title.lower().replace("`", "")).strip("-")
+    return slug or "section"
+
+
+def section_ids(sections):
+    """Stable slug-path IDs for a file's sections; repeated paths get -2, -3, ... suffixes."""
+    ids = []
+    seen = {}
+    parents = {}
+    for section in sections:
+        level = section["level"]
+        parent = ""
+        for parent_level in sorted(parents):
+            if parent_level < level:
+                parent = parents[parent_level]
+        if not level:
+            # Text before the first heading
+            ids.append(PREAMBLE_ID)
+            continue
+        slug = slugify(section["title"])
+        candidate = f"{parent}/{slug}" if parent else slug
+        seen[candidate] = seen.get(candidate, 0) + 1
+        if seen[candidate] > 1:
+            candidate = f"{candidate}-{seen[candidate]}"
+        parents = {k: v for k, v in parents.items() if k < level}
+        parents[level] = candidate
+        ids.append(candidate)
+    return ids
+
+
+def toc_path(references_dir):
+    return os.path.join(references_dir, TOC_FILENAME)
+
+
+def load_toc(references_dir):
+    try:
+        with open(toc_path(references_dir), "r", encoding="utf-8") as f:
+            toc = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return toc if toc.get("version") == TOC_VERSION else None
+
+
+def index_file(path, relpath):
+    """TOC entry for one markdown file: hash, size and [id, heading, line, offset, length, tokens] rows."""
+    with open(path, "rb") as f:
+        data = f.read()
+    stem = os.path.splitext(os.path.basename(relpath))[0]
+    sections = split_sections(data, stem)
+    rows = []
+    for section_id, section in zip(section_ids(sections), sections):
+        length = section["end"] - section["start"]
+        rows.append([section_id, " > ".join(section["heading_path"]), section["line"],
+                     section["start"], length, (length + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN])
+    return {"sha256": hashlib.sha256(data).hexdigest(), "size": len(data), "sections": rows}
+
+
+def build_toc(references_dir):
+    """
+    Write references_dir/toc.json, re-indexing only files whose size or hash changed.
+
+    Returns:
+        (files indexed, files reused, total sections)
+    """
+    previous = (load_toc(references_dir) or {}).get("files", {})
+    files = {}
+    indexed = reused = 0
+
+    for dirpath, dirnames, filenames in os.walk(references_dir):
+        dirnames[:] = sorted(d for d in dirnames if not d.startswith("."))
+        for name in sorted(filenames):
+            if not name.lower().endswith(MARKDOWN_SUFFIXES):
+                continue
+            path = os.path.join(dirpath, name)
+            relpath = os.path.relpath(path, references_dir).replace(os.sep, "/")
+            old = previous.get(relpath)
+            if old and old["size"] == os.path.getsize(path):
+                with open(path, "rb") as f:
+                    if hashlib.sha256(f.read()).hexdigest() == old["sha256"]:
+                        files[relpath] = old
+                        reused += 1
+                        continue
+            files[relpath] = index_file(path, relpath)
+            indexed += 1
+
+    toc = {"version": TOC_VERSION,
+           "columns": ["id", "heading", "line", "offset", "length", "tokens"],
+           "files": dict(sorted(files.items()))}
+    tmp = toc_path(references_dir) + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(toc, f, separators=(",", ":"), ensure_ascii=False)
+    os.replace(tmp, toc_path(references_dir))
+    return indexed, reused, sum(len(entry["sections"]) for entry in files.values())
+
+
+def find_reference_dirs(skills_dir=SKILLS_DIR):
+    if not os.path.isdir(skills_dir):
+        return []
+    return [os.path.join(skills_dir, skill, "references") for skill in sorted(os.listdir(skills_dir))
+            if os.path.isdir(os.path.join(skills_dir, skill, "references"))]
+
+
+def build_all(skills_dir=SKILLS_DIR):
+    """Build the TOC for every skill with a references directory. Returns {skill: build_toc result}."""
+    return {os.path.basename(os.path.dirname(d)): build_toc(d) for d in find_reference_dirs(skills_dir)}
+
+
+def resolve_references(skill):
+    """Accept a skill name (under skills/), a skill folder or a references folder."""
+    for candidate in (os.path.join(SKILLS_DIR, skill, "references"), os.path.join(skill, "references"), skill):
+        if os.path.isfile(toc_path(candidate)):
+            return candidate
+    return None
+
+
+def read_section(references_dir, section_id, toc=None, subtree=False):
+    """
+    Read one section by ID with a single seek-and-read. With subtree, the
+    section's nested subsections (which follow it contiguously) are included.
+
+    Returns:
+        (text, error) - error is None on success
+    """
+    toc = toc or load_toc(references_dir)
+    if toc is None:
+        return None, f"No {TOC_FILENAME} in {references_dir}; run `reference_toc.py build`"
+    relpath, _, anchor = section_id.partition("#")
+    entry = toc["files"].get(relpath)
+    if entry is None:
+        return None, f"Unknown file: {relpath}"
+    rows = entry["sections"]
+    index = next((i for i, r in enumerate(rows) if r[0] == anchor), None) if anchor else None
+    row = rows[index] if index is not None else None
+    length = row[4] if row else 0
+    if row and subtree and anchor != PREAMBLE_ID:
+        for child in rows[index + 1:]:
+            if not child[0].startswith(anchor + "/"):
+                break
+            length = child[3] + child[4] - row[3]
+    path = os.path.join(references_dir, relpath)
+    try:
+        if os.path.getsize(path) != entry["size"]:
+            return None, f"{relpath} changed since the TOC was built; run `reference_toc.py build`"
+        with open(path, "rb") as f:
+            if row is None:
+                if anchor:
+                    return None, f"Unknown section: {section_id}"
+                return f.read().decode("utf-8", "replace"), None
+            f.seek(row[3])
+            return f.read(length).decode("utf-8", "replace"), None
+    except OSError as e:
+        return None, str(e)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Section-level table of contents for skills/*/references",
+        epilog="""Examples:
+  reference_toc.py build
+  reference_toc.py list nix manual/languages-frameworks/go
+  reference_toc.py get nix 'manual/languages-frameworks/go.section.md#go/buildgomodule'""",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    build = commands.add_parser("build", help="Write references/toc.json for each skill")
+    build.add_argument("skills", nargs="*", help="Skill names (default: every skill with references)")
+
+    listing = commands.add_parser("list", help="List section IDs with their size")
+    listing.add_argument("skill", help="Skill name or folder")
+    listing.add_argument("prefix", nargs="?", default="", help="Only list IDs starting with this prefix")
+    listing.add_argument("--json", "-j", action="store_true", help="Output rows as JSON lines")
+
+    get = commands.add_parser("get", help="Print one section")
+    get.add_argument("skill", help="Skill name or folder")
+    get.add_argument("ids", nargs="+", metavar="id", help="Section ID (<file>#<slug path>), or a file to print it whole")
+    get.add_argument("--subtree", "-r", action="store_true", help="Include nested subsections")
+    args = parser.parse_args()
+
+    if args.command == "build":
+        dirs = ([os.path.join(SKILLS_DIR, s, "references") for s in args.skills]
+                if args.skills else find_reference_dirs())
+        for references_dir in dirs:
+            if not os.path.isdir(references_dir):
+                print(f"Error: {references_dir} not found", file=sys.stderr)
+                sys.exit(1)
+            indexed, reused, sections = build_toc(references_dir)
+            print(f"{os.path.relpath(toc_path(references_dir))}: {indexed} indexed, {reused} unchanged, {sections} sections")
+        return
+
+    references_dir = resolve_references(args.skill)
+    if references_dir is None:
+        print(f"Error: no {TOC_FILENAME} found for {args.skill}; run `reference_toc.py build`", file=sys.stderr)
+        sys.exit(1)
+    toc = load_toc(references_dir)
+
+    if args.command == "list":
+        for relpath, entry in toc["files"].items():
+            for section_id, heading, line, offset, length, tokens in entry["sections"]:
+                full_id = f"{relpath}#{section_id}"
+                if not full_id.startswith(args.prefix):
+                    continue
+                if args.json:
+                    print(json.dumps({"id": full_id, "heading": heading, "line": line, "offset": offset,
+                                      "length": length, "tokens": tokens}, ensure_ascii=False))
+                else:
+                    print(f"{full_id:<72} ~{tokens:>7,} tokens")
+        return
+
+    failed = False
+    for section_id in args.ids:
+        text, error = read_section(references_dir, section_id, toc, args.subtree)
+        if error:
+            print(f"Error: {error}", file=sys.stderr)
+            failed = True
+            continue
+        if len(args.ids) > 1:
+            print(f"==> {section_id} <==")
+        sys.stdout.write(text if text.endswith("\n") else text + "\n")
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
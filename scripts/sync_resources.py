@@ -1,7 +1,24 @@
 #!/usr/bin/env nix
 #!nix shell nixpkgs#python3 --command python3
+"""
+Sync the resources listed in resources.json into the repository.
+
+Each entry has a name, a type ("file" or "git"), a url and a path relative
+to the repository root. A git resource replaces its path with files from
+the repository's HEAD and accepts:
+
+    sparse_checkout  top-level paths of the tree to sync
+    move_from        directory whose contents land directly in path
+    files_filter     regex a file's path (with a leading /) must match
+    keep             files or directories under path that are maintained in
+                     this repository; they survive the sync unchanged and take
+                     precedence over the upstream versions, which are
+                     therefore not picked up until removed from the list
+"""
 import json
 import os
+import argparse
+import hashlib
 import time
 import urllib.request
 import urllib.error
@@ -10,6 +27,15 @@ import subprocess
 import shutil
 import tempfile
 import re
+from tracing import span
+
+try:
+    import fcntl
+except ImportError:  # No flock on this platform: run without coordination
+    fcntl = None
+
+# A resource synced (by any process) less than this many seconds ago is reused
+DEFAULT_MAX_AGE = 120
 
 # Color codes for output
 GREEN = '\033[92m'
@@ -21,11 +47,14 @@ def log(message, color=RESET):
     print(f"{color}{message}{RESET}")
 
 def run_command(command, cwd=None):
-    try:
-        result = subprocess.run(command, cwd=cwd, check=True, capture_output=True, text=True)
-        return True, result.stdout
-    except subprocess.CalledProcessError as e:
-        return False, e.stderr
+    with span(" ".join(command[:2]), **{"process.command_args": command}) as s:
+        try:
+            result = subprocess.run(command, cwd=cwd, check=True, capture_output=True, text=True)
+            return True, result.stdout
+        except subprocess.CalledProcessError as e:
+            s.set("process.exit_code", e.returncode)
+            s.error(e.stderr.strip())
+            return False, e.stderr
 
 def download_file(url, target_path, retries=3, delay=2):
     log(f"Downloading {url} to {target_path}...", YELLOW)
@@ -33,8 +62,12 @@ def download_file(url, target_path, retries=3, delay=2):
     for attempt in range(retries):
         try:
             req = urllib.request.Request(url, headers={'Accept': 'application/json', 'User-Agent': 'Mozilla/5.0'})
-            with urllib.request.urlopen(req) as response, open(target_path, 'wb') as out_file:
-                out_file.write(response.read())
+            with span("GET", kind="client", **{"url.full": url, "attempt": attempt + 1}) as s, \
+                    urllib.request.urlopen(req) as response, open(target_path, 'wb') as out_file:
+                data = response.read()
+                s.set("http.response.status_code", response.status)
+                s.set("http.response.body.size", len(data))
+                out_file.write(data)
 
             size = os.path.getsize(target_path)
             size_h = f"{size / 1024:.2f} KB" if size < 1024 * 1024 else f"{size / (1024 * 1024):.2f} MB"
@@ -62,7 +95,123 @@ def download_file(url, target_path, retries=3, delay=2):
     log(f"Failed to download {url} after {retries} attempts (QAQ)", RED)
     return False
 
-def sync_git(url, target_path, sparse_checkout=None, move_from=None, files_filter=None):
+def tree_destination(path, sparse_checkout=None, move_from=None):
+    """
+    Where a file at `path` in the repository tree lands, relative to the
+    target directory, or None if it is not synced.
+
+    Files under move_from are placed relative to it; other sparse_checkout
+    entries keep their last path component. Without move_from the tree
+    layout is kept as-is.
+    """
+    if not move_from:
+        return path
+    base = move_from.strip('/')
+    if path.startswith(base + '/'):
+        return path[len(base) + 1:]
+    for item in sparse_checkout or []:
+        item = item.strip('/')
+        if item == base:
+            continue
+        if path == item or path.startswith(item + '/'):
+            return os.path.basename(item) + path[len(item):]
+    return None
+
+def extract_tree(repo_dir, rev, target_path, pathspecs, destination):
+    """
+    Write the blobs of `rev` selected by `destination(path)` straight into
+    target_path, reading them through one `git cat-file --batch` process.
+    No working tree is checked out. Symlinks pointing inside the tree are
+    written as copies of their target, like copytree did with a checkout;
+    links that leave the tree or do not resolve are skipped.
+    Returns the number of files written.
+    """
+    with span("git ls-tree", **{"process.command_args": ['git', 'ls-tree', '-r', rev] + pathspecs}):
+        listing = subprocess.run(['git', 'ls-tree', '-r', '-z', rev, '--'] + pathspecs,
+                                 cwd=repo_dir, check=True, capture_output=True).stdout
+
+    entries = []
+    for record in listing.split(b'\0'):
+        if not record:
+            continue
+        meta, _, path = record.partition(b'\t')
+        mode, kind, sha = meta.split()
+        # Submodules (commit entries) have no content here
+        if kind != b'blob':
+            continue
+        dest = destination(os.fsdecode(path))
+        if dest:
+            # Symlinks are requested by path so cat-file resolves them within the tree
+            name = rev.encode() + b':' + path if mode == b'120000' else sha
+            entries.append((mode, name, os.path.join(target_path, dest)))
+
+    with span("git cat-file", files=len(entries)), \
+            subprocess.Popen(['git', 'cat-file', '--batch', '--follow-symlinks'], cwd=repo_dir,
+                             stdin=subprocess.PIPE, stdout=subprocess.PIPE) as proc:
+        written = 0
+        for mode, name, dest in entries:
+            proc.stdin.write(name + b'\n')
+            proc.stdin.flush()
+            header = proc.stdout.readline().split()
+            if len(header) == 2 and header[1] == b'missing':
+                raise RuntimeError(f"git cat-file: {name.decode()} is missing")
+            if len(header) == 2:
+                # "symlink" (leaves the tree; the text is relative to the repository root, not the
+                # link), "dangling", "loop" or "notdir": nothing inside the tree to copy
+                proc.stdout.read(int(header[1]) + 1)
+                log(f"Skipping unresolvable symlink {name.decode()} ({header[0].decode()})", YELLOW)
+                continue
+            size = int(header[2])
+
+            os.makedirs(os.path.dirname(dest), exist_ok=True)
+            if header[1] != b'blob':
+                # A symlink to a directory: its files are not part of the selection
+                proc.stdout.read(size)
+            else:
+                with open(dest, 'wb') as f:
+                    remaining = size
+                    while remaining:
+                        chunk = proc.stdout.read(min(remaining, 1 << 20))
+                        if not chunk:
+                            raise RuntimeError("git cat-file: unexpected end of output")
+                        f.write(chunk)
+                        remaining -= len(chunk)
+                if mode == b'100755':
+                    os.chmod(dest, 0o755)
+                written += 1
+            # Each object is followed by a newline
+            proc.stdout.read(1)
+        proc.stdin.close()
+    return written
+
+def save_kept(target_path, keep, save_dir):
+    """Move the `keep` paths out of target_path into save_dir. Returns the ones that existed."""
+    relpaths = [os.path.normpath(item) for item in keep or []]
+    for item, relpath in zip(keep or [], relpaths):
+        if os.path.isabs(relpath) or relpath.split(os.sep)[0] in ('..', '.'):
+            raise ValueError(f"keep entry must be inside the resource path: {item}")
+    saved = []
+    for relpath in relpaths:
+        source = os.path.join(target_path, relpath)
+        if os.path.lexists(source):
+            os.makedirs(os.path.dirname(os.path.join(save_dir, relpath)), exist_ok=True)
+            shutil.move(source, os.path.join(save_dir, relpath))
+            saved.append(relpath)
+    return saved
+
+def restore_kept(target_path, saved, save_dir):
+    """Put the saved `keep` paths back, replacing what the sync wrote there."""
+    for relpath in saved:
+        dest = os.path.join(target_path, relpath)
+        if os.path.isdir(dest) and not os.path.islink(dest):
+            shutil.rmtree(dest)
+        elif os.path.lexists(dest):
+            log(f"Keeping local {relpath} over the upstream version", YELLOW)
+            os.remove(dest)
+        os.makedirs(os.path.dirname(dest), exist_ok=True)
+        shutil.move(os.path.join(save_dir, relpath), dest)
+
+def sync_git(url, target_path, sparse_checkout=None, move_from=None, files_filter=None, keep=None):
     log(f"Syncing git repo {url} to {target_path}...", YELLOW)
     
     # Compile filter pattern if provided
@@ -70,100 +219,174 @@ def sync_git(url, target_path, sparse_checkout=None, move_from=None, files_filte
     if files_filter:
         filter_pattern = re.compile(files_filter)
         log(f"Using file filter: {files_filter}", YELLOW)
-    
-    def copy_filtered(src, dst, filter_pattern):
-        """递归复制目录，只复制匹配 filter_pattern 的文件"""
-        if not os.path.exists(dst):
-            os.makedirs(dst)
-        
-        for item in os.listdir(src):
-            s = os.path.join(src, item)
-            d = os.path.join(dst, item)
-            
-            if os.path.isdir(s):
-                # 递归复制子目录
-                copy_filtered(s, d, filter_pattern)
-                # 如果子目录为空，删除它
-                if os.path.exists(d) and not os.listdir(d):
-                    os.rmdir(d)
-            else:
-                # 检查文件是否匹配 filter
-                if filter_pattern is None or filter_pattern.search(s):
-                    shutil.copy2(s, d)
+
+    def destination(path):
+        # Filters were written against checkout paths, so match with a leading slash
+        if filter_pattern and not filter_pattern.search('/' + path):
+            return None
+        return tree_destination(path, sparse_checkout, move_from)
+
+    # sparse_checkout entries select top-level paths of the tree
+    pathspecs = [item.strip('/') for item in sparse_checkout or ([move_from] if move_from else [])]
 
     with tempfile.TemporaryDirectory() as temp_dir:
-        # Initialize sparse repo
-        run_command(['git', 'init'], cwd=temp_dir)
+        # Only the object store is needed; nothing is checked out
+        run_command(['git', 'init', '--bare', '-q'], cwd=temp_dir)
         run_command(['git', 'remote', 'add', 'origin', url], cwd=temp_dir)
 
-        if sparse_checkout:
-            run_command(['git', 'config', 'core.sparseCheckout', 'true'], cwd=temp_dir)
-            sparse_file = os.path.join(temp_dir, '.git/info/sparse-checkout')
-            with open(sparse_file, 'w') as f:
-                for item in sparse_checkout:
-                    f.write(f"{item}\n")
-
-        success, err = run_command(['git', 'pull', '--depth', '1', 'origin', 'HEAD'], cwd=temp_dir)
+        success, err = run_command(['git', 'fetch', '--depth', '1', '--no-tags', 'origin', 'HEAD'], cwd=temp_dir)
         if not success:
-            log(f"Git pull failed: {err}", RED)
+            log(f"Git fetch failed: {err}", RED)
             return False
 
-        # Prepare target directory
-        if os.path.exists(target_path):
-            shutil.rmtree(target_path)
-        os.makedirs(target_path)
-
-        source_base = temp_dir
-        if move_from:
-            source_dir = os.path.join(temp_dir, move_from)
-            if os.path.exists(source_dir):
-                # If move_from is a directory, copy its contents
-                for item in os.listdir(source_dir):
-                    s = os.path.join(source_dir, item)
-                    d = os.path.join(target_path, item)
-                    if os.path.isdir(s):
-                        if filter_pattern:
-                            copy_filtered(s, d, filter_pattern)
-                        else:
-                            shutil.copytree(s, d)
-                    else:
-                        if filter_pattern is None or filter_pattern.search(s):
-                            shutil.copy2(s, d)
-
-            # Also check for other items in sparse_checkout that might not be in move_from
-            if sparse_checkout:
-                for item in sparse_checkout:
-                    if item != move_from:
-                        s = os.path.join(temp_dir, item)
-                        if os.path.exists(s) and not s.startswith(os.path.join(temp_dir, move_from)):
-                            d = os.path.join(target_path, os.path.basename(item))
-                            if os.path.isdir(s):
-                                if filter_pattern:
-                                    copy_filtered(s, d, filter_pattern)
-                                else:
-                                    shutil.copytree(s, d)
-                            else:
-                                if filter_pattern is None or filter_pattern.search(s):
-                                    shutil.copy2(s, d)
-        else:
-            # Copy everything from temp_dir (except .git)
-            for item in os.listdir(temp_dir):
-                if item == '.git': continue
-                s = os.path.join(temp_dir, item)
-                d = os.path.join(target_path, item)
-                if os.path.isdir(s):
-                    if filter_pattern:
-                        copy_filtered(s, d, filter_pattern)
-                    else:
-                        shutil.copytree(s, d)
-                else:
-                    if filter_pattern is None or filter_pattern.search(s):
-                        shutil.copy2(s, d)
-
-        log(f"Success! Git repo synced to {target_path} (。・ω・。)ノ", GREEN)
+        with span("extract", **{"target.path": target_path}) as s:
+            # Files maintained locally are set aside and put back even if extraction fails
+            save_dir = os.path.join(temp_dir, 'keep')
+            try:
+                saved = save_kept(target_path, keep, save_dir) if os.path.isdir(target_path) else []
+            except ValueError as e:
+                log(f"Invalid resource: {e}", RED)
+                return False
+            try:
+                # Prepare target directory
+                if os.path.exists(target_path):
+                    shutil.rmtree(target_path)
+                os.makedirs(target_path)
+
+                try:
+                    count = extract_tree(temp_dir, 'FETCH_HEAD', target_path, pathspecs, destination)
+                except (subprocess.CalledProcessError, RuntimeError, OSError) as e:
+                    log(f"Extracting files failed: {e}", RED)
+                    return False
+                s.set("files", count)
+            finally:
+                restore_kept(target_path, saved, save_dir)
+            if saved:
+                log(f"Kept {len(saved)} locally maintained paths: {', '.join(saved)}", YELLOW)
+
+        log(f"Success! Git repo synced to {target_path} ({count} files) (。・ω・。)ノ", GREEN)
         return True
 
+def sync_resource(res, target_path):
+    res_type = res.get('type', 'file')
+    if res_type == 'file':
+        return download_file(res['url'], target_path)
+    if res_type == 'git':
+        return sync_git(
+            res['url'],
+            target_path,
+            sparse_checkout=res.get('sparse_checkout'),
+            move_from=res.get('move_from'),
+            files_filter=res.get('files_filter'),
+            keep=res.get('keep')
+        )
+    log(f"Unknown resource type: {res_type}", RED)
+    return False
+
+def read_state(state_path):
+    try:
+        with open(state_path, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def write_state(state_path, state):
+    tmp = f"{state_path}.{os.getpid()}.tmp"
+    with open(tmp, 'w') as f:
+        json.dump(state, f)
+    os.replace(tmp, state_path)
+
+def single_flight(state_dir, key, config, max_age, work, reuse_running=True):
+    """
+    Run work() for `key` in at most one process at a time.
+
+    Holds an exclusive flock on <state_dir>/<key>.lock while working. A
+    process that finds the lock taken waits for it and then reuses the
+    holder's result instead of repeating the work; a successful result for
+    the same config finished less than max_age seconds ago is reused too.
+
+    With reuse_running=False only a run that started after this call is
+    reused, for work whose result depends on state the caller has just
+    changed: a run already in progress when we arrived may have read it
+    before the change.
+
+    Returns (success, reused).
+    """
+    if fcntl is None:
+        return work(), False
+
+    os.makedirs(state_dir, exist_ok=True)
+    digest = hashlib.sha256(key.encode('utf-8')).hexdigest()[:16]
+    state_path = os.path.join(state_dir, f"{digest}.json")
+    config_hash = hashlib.sha256(json.dumps(config, sort_keys=True).encode('utf-8')).hexdigest()
+
+    with open(os.path.join(state_dir, f"{digest}.lock"), 'a') as lock:
+        started = time.time()
+        try:
+            fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            waited = False
+        except BlockingIOError:
+            log(f"Another process is syncing {key}, waiting for it... (。・ω・。)", YELLOW)
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            waited = True
+
+        state = read_state(state_path)
+        if state and state.get('success') and state.get('config') == config_hash:
+            age = time.time() - state['finished']
+            since = state.get('started', 0) if not reuse_running else state['finished']
+            if waited and since >= started:
+                log(f"Reusing {key}: synced by another process (≧∇≦)/", GREEN)
+                return True, True
+            if age < max_age:
+                log(f"Reusing {key}: synced {age:.0f}s ago (≧∇≦)/", GREEN)
+                return True, True
+
+        work_started = time.time()
+        success = work()
+        write_state(state_path, {'key': key, 'config': config_hash, 'success': bool(success),
+                                 'started': work_started, 'finished': time.time(), 'pid': os.getpid()})
+        return success, False
+
+def post_sync():
+    """Refresh the derived indexes over the synced references."""
+    try:
+        from reference_index import update_index
+        log("Updating reference search index...", YELLOW)
+        with span("update reference index"):
+            stats = update_index()
+        log(f"Reference index updated: {stats['added']} added, {stats['updated']} updated, "
+            f"{stats['removed']} removed, {stats['unchanged']} unchanged (≧∇≦)/", GREEN)
+    except Exception as e:
+        log(f"Failed to update reference index: {e} (´・ω・｀)", YELLOW)
+    try:
+        from reference_toc import build_all
+        log("Updating reference tables of contents...", YELLOW)
+        with span("build reference tocs"):
+            tocs = build_all()
+        for skill, (indexed, reused, sections) in tocs.items():
+            log(f"{skill}: {indexed} files indexed, {reused} unchanged, {sections} sections", GREEN)
+    except Exception as e:
+        log(f"Failed to update reference tables of contents: {e} (´・ω・｀)", YELLOW)
+
+    # Skill-specific catalogs are built by the skill's own scripts
+    project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    catalog_script = os.path.join(project_root, 'skills', 'opentelemetry-collector', 'scripts', 'component_catalog.py')
+    if os.path.isdir(os.path.join(project_root, 'skills', 'opentelemetry-collector', 'references', 'components')):
+        log("Updating OpenTelemetry Collector component catalog...", YELLOW)
+        success, output = run_command([sys.executable, catalog_script, 'build'])
+        if success:
+            log(output.strip(), GREEN)
+        else:
+            log(f"Failed to build component catalog: {output.strip()} (´・ω・｀)", YELLOW)
+    log("--------------------------------------------")
+
 def main():
+    parser = argparse.ArgumentParser(description="Sync the resources listed in resources.json")
+    parser.add_argument('--max-age', type=float, default=DEFAULT_MAX_AGE,
+                        help=f"Reuse resources synced less than this many seconds ago (default: {DEFAULT_MAX_AGE})")
+    parser.add_argument('--force', action='store_true', help="Sync every resource even if it is fresh")
+    args = parser.parse_args()
+
     script_dir = os.path.dirname(os.path.abspath(__file__))
     project_root = os.path.dirname(script_dir)
     config_path = os.path.join(project_root, 'resources.json')
@@ -184,7 +407,10 @@ def main():
     log("============================================")
 
     success_count = 0
+    reused_count = 0
     fail_count = 0
+    max_age = 0 if args.force else args.max_age
+    state_dir = os.path.join(project_root, '.cache', 'sync')
 
     for res in resources:
         name = res.get('name', 'Unknown')
@@ -204,32 +430,34 @@ def main():
 
         log(f"Processing: {name} ({res_type})")
 
-        success = False
-        if res_type == 'file':
-            success = download_file(url, target_path)
-        elif res_type == 'git':
-            success = sync_git(
-                url,
-                target_path,
-                sparse_checkout=res.get('sparse_checkout'),
-                move_from=res.get('move_from'),
-                files_filter=res.get('files_filter')
+        with span(f"sync {name}", **{"resource.type": res_type, "url.full": url, "target.path": path}) as s:
+            success, reused = single_flight(
+                state_dir, path, res, max_age,
+                lambda: sync_resource(res, target_path)
             )
-        else:
-            log(f"Unknown resource type: {res_type}", RED)
+            s.set("reused", reused)
+            if not success:
+                s.error(f"Failed to sync {name}")
 
-        if success:
+        if reused:
+            reused_count += 1
+        elif success:
             success_count += 1
         else:
             fail_count += 1
         log("--------------------------------------------")
 
+    # A post-sync already running when we got here may have indexed the tree before our
+    # resources were written, so only one that started after we began waiting is reused
+    single_flight(state_dir, 'post-sync', None, 0, lambda: post_sync() or True, reuse_running=False)
+
     log("============================================")
     if fail_count == 0:
-        log(f"All done! Updated {success_count} resources. Perfect! (≧∇≦)/", GREEN)
+        log(f"All done! Updated {success_count} resources, reused {reused_count} fresh ones. Perfect! (≧∇≦)/", GREEN)
     else:
-        log(f"Finished with errors. Success: {success_count}, Failed: {fail_count}. Please check logs. (´・ω・｀)", YELLOW)
+        log(f"Finished with errors. Success: {success_count}, Reused: {reused_count}, Failed: {fail_count}. Please check logs. (´・ω・｀)", YELLOW)
     log("============================================")
 
 if __name__ == "__main__":
-    main()
+    with span("sync_resources"):
+        main()
@@ -0,0 +1,218 @@
+"""
+Optional OpenTelemetry tracing for the repository's scripts.
+
+Spans are recorded only when an OTLP endpoint is configured through the
+standard environment variables; otherwise span() hands back a shared no-op
+object and nothing else runs. Finished spans are batched and exported as
+OTLP/HTTP JSON (POST <endpoint>/v1/traces) with the standard library only.
+
+    OTEL_EXPORTER_OTLP_ENDPOINT          e.g. http://localhost:4318
+    OTEL_EXPORTER_OTLP_TRACES_ENDPOINT   full traces URL, overrides the above
+    OTEL_EXPORTER_OTLP_HEADERS           key=value,key2=value2
+    OTEL_EXPORTER_OTLP_TIMEOUT           export timeout in ms (default: 10000)
+    OTEL_SERVICE_NAME                    defaults to the script name
+    OTEL_SDK_DISABLED=true               turns tracing off
+    TRACEPARENT                          W3C trace context to continue
+
+Usage:
+    from tracing import span
+
+    with span("http GET", kind="client", **{"url.full": url}) as s:
+        ...
+        s.set("http.response.status_code", 200)
+
+Skill scripts import this module optionally and fall back to no-op spans,
+since it is not part of the installed skills; to trace them from a checkout,
+put this directory on the path (PYTHONPATH=scripts).
+"""
+import os
+import sys
+import time
+import atexit
+import threading
+
+KINDS = {"internal": 1, "server": 2, "client": 3, "producer": 4, "consumer": 5}
+MAX_BATCH = 512
+
+
+def _traces_endpoint():
+    if os.environ.get("OTEL_SDK_DISABLED", "").lower() == "true":
+        return None
+    endpoint = os.environ.get("OTEL_EXPORTER_OTLP_TRACES_ENDPOINT")
+    if endpoint:
+        return endpoint
+    endpoint = os.environ.get("OTEL_EXPORTER_OTLP_ENDPOINT")
+    if endpoint:
+        return endpoint.rstrip("/") + "/v1/traces"
+    return None
+
+
+ENDPOINT = _traces_endpoint()
+ENABLED = ENDPOINT is not None
+
+
+class _NoopSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set(self, key, value):
+        pass
+
+    def error(self, message):
+        pass
+
+
+_NOOP = _NoopSpan()
+
+
+def span(name, kind="internal", **attributes):
+    """Context manager recording a span; a no-op unless tracing is enabled."""
+    if not ENABLED:
+        return _NOOP
+    return _Span(name, kind, attributes)
+
+
+def flush():
+    """Export buffered spans now (worker processes call this before returning)."""
+    if ENABLED:
+        _export()
+
+
+# Everything below only runs when tracing is enabled
+
+_local = threading.local()
+_lock = threading.Lock()
+_pending = []
+# Outermost open span of the main thread; spans started on worker threads
+# with no open span of their own nest under it
+_root = None
+
+
+def _parent_from_env():
+    parts = os.environ.get("TRACEPARENT", "").split("-")
+    if len(parts) == 4 and len(parts[1]) == 32 and len(parts[2]) == 16:
+        return parts[1], parts[2]
+    return None
+
+
+class _Span:
+    __slots__ = ("name", "kind", "attributes", "trace_id", "span_id", "parent_id", "start", "status")
+
+    def __init__(self, name, kind, attributes):
+        self.name = name
+        self.kind = KINDS.get(kind, 1)
+        self.attributes = attributes
+        self.status = None
+
+    def __enter__(self):
+        global _root
+        stack = getattr(_local, "stack", None)
+        if stack is None:
+            stack = _local.stack = []
+        parent = stack[-1] if stack else _root
+        if parent is not None:
+            self.trace_id, self.parent_id = parent.trace_id, parent.span_id
+        else:
+            self.trace_id, self.parent_id = _parent_from_env() or (os.urandom(16).hex(), None)
+        self.span_id = os.urandom(8).hex()
+        if not stack and threading.current_thread() is threading.main_thread():
+            _root = self
+        stack.append(self)
+        self.start = time.time_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        global _root
+        end = time.time_ns()
+        _local.stack.pop()
+        if _root is self:
+            _root = None
+        if exc_type is not None and not (exc_type is SystemExit and exc.code in (None, 0)):
+            self.error(f"{exc_type.__name__}: {exc}")
+        record = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": self.kind,
+            "startTimeUnixNano": str(self.start),
+            "endTimeUnixNano": str(end),
+            "attributes": [_attribute(k, v) for k, v in self.attributes.items() if v is not None],
+            "status": self.status or {"code": 0},
+        }
+        if self.parent_id:
+            record["parentSpanId"] = self.parent_id
+        with _lock:
+            _pending.append(record)
+            full = len(_pending) >= MAX_BATCH
+        if full:
+            _export()
+        return False
+
+    def set(self, key, value):
+        self.attributes[key] = value
+
+    def error(self, message):
+        self.status = {"code": 2, "message": str(message)}
+
+
+def _attribute(key, value):
+    if isinstance(value, bool):
+        encoded = {"boolValue": value}
+    elif isinstance(value, int):
+        encoded = {"intValue": str(value)}
+    elif isinstance(value, float):
+        encoded = {"doubleValue": value}
+    elif isinstance(value, (list, tuple)):
+        encoded = {"arrayValue": {"values": [{"stringValue": str(v)} for v in value]}}
+    else:
+        encoded = {"stringValue": str(value)}
+    return {"key": key, "value": encoded}
+
+
+def _export():
+    import json
+    import urllib.parse
+    import urllib.request
+
+    with _lock:
+        spans = _pending[:]
+        del _pending[:]
+    if not spans:
+        return
+    service = os.environ.get("OTEL_SERVICE_NAME") or os.path.splitext(os.path.basename(sys.argv[0] or "python"))[0]
+    body = {"resourceSpans": [{
+        "resource": {"attributes": [_attribute("service.name", service),
+                                    _attribute("process.pid", os.getpid())]},
+        "scopeSpans": [{"scope": {"name": "skills.tracing"}, "spans": spans}],
+    }]}
+    headers = {"Content-Type": "application/json"}
+    for item in os.environ.get("OTEL_EXPORTER_OTLP_HEADERS", "").split(","):
+        key, sep, value = item.partition("=")
+        if sep and key.strip():
+            headers[key.strip()] = urllib.parse.unquote(value.strip())
+    try:
+        timeout = float(os.environ.get("OTEL_EXPORTER_OTLP_TIMEOUT", "10000")) / 1000
+    except ValueError:
+        timeout = 10.0
+    try:
+        req = urllib.request.Request(ENDPOINT, data=json.dumps(body).encode("utf-8"), headers=headers, method="POST")
+        with urllib.request.urlopen(req, timeout=timeout) as resp:
+            resp.read()
+    except Exception as e:
+        print(f"tracing: failed to export {len(spans)} spans to {ENDPOINT}: {e}", file=sys.stderr)
+
+
+def _after_fork():
+    # A forked worker must not re-export the parent's buffered spans
+    global _pending, _lock
+    _pending = []
+    _lock = threading.Lock()
+
+
+if ENABLED:
+    atexit.register(_export)
+    if hasattr(os, "register_at_fork"):
+        os.register_at_fork(after_in_child=_after_fork)
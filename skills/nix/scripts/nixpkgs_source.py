@@ -11,56 +11,234 @@ Usage:
 
   # Use a specific branch/channel
   ./nixpkgs_source.py --ref nixos-24.11 pkgs/by-name/he/hello/package.nix
+
+  # Only print lines 10-40, or 15 lines around line 120
+  ./nixpkgs_source.py pkgs/top-level/all-packages.nix:10-40
+  ./nixpkgs_source.py --context 15 pkgs/top-level/all-packages.nix:120
+
+  # Fetch several files concurrently (also accepts paths on stdin)
+  ./nixpkgs_source.py pkgs/by-name/he/hello/package.nix pkgs/by-name/he/hello/test.nix
+
+Directory listings use the GitHub API (60 requests/hour anonymously). Set
+GITHUB_TOKEN or GH_TOKEN to raise the limit; responses are cached by ETag
+under $XDG_CACHE_HOME/nixpkgs_source and reused when the limit is hit.
 """
+import os
 import sys
+import re
 import json
+import time
+import hashlib
 import argparse
+import tempfile
+import threading
 import urllib.request
 import urllib.error
+from concurrent.futures import ThreadPoolExecutor
+try:
+    from tracing import span
+except ImportError:  # Tracing is optional; tracing.py lives in the repository's scripts/
+    class _NoopSpan:
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):
+            return False
+
+        def set(self, key, value):
+            pass
+
+        def error(self, message):
+            pass
+
+    def span(name, kind="internal", **attributes):
+        return _NoopSpan()
+
 
 DEFAULT_REF = "nixos-unstable"
-GITHUB_API = "https://api.github.com/repos/NixOS/nixpkgs/contents"
-GITHUB_RAW = "https://raw.githubusercontent.com/NixOS/nixpkgs"
+# Overridable so the scripts can be pointed at local stand-ins (see scripts/bench_nix_scripts.py)
+GITHUB_API = os.environ.get("NIXPKGS_GITHUB_API", "https://api.github.com/repos/NixOS/nixpkgs/contents")
+GITHUB_RAW = os.environ.get("NIXPKGS_GITHUB_RAW", "https://raw.githubusercontent.com/NixOS/nixpkgs")
+DEFAULT_JOBS = 8
+
+# GitHub API rate limiting: a token raises the budget from 60 to 5000
+# requests/hour. State and ETag-cached responses live under cache_dir().
+TOKEN_ENV_VARS = ("GITHUB_TOKEN", "GH_TOKEN")
+RATE_LIMIT_FILE = "ratelimit.json"
+RATE_LIMIT_MAX_WAIT = 60
+_state_lock = threading.Lock()
+
+# "42" or "10-20" after the last ":" in a path
+LINE_RANGE_RE = re.compile(r"^(\d+)(?:-(\d+))?$")
+
+
+def github_token():
+    """GitHub token from the environment, if any."""
+    for var in TOKEN_ENV_VARS:
+        token = os.environ.get(var)
+        if token:
+            return token
+    return None
+
+
+def cache_dir():
+    """Directory holding the rate limit state and ETag cache."""
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+    return os.path.join(base, "nixpkgs_source")
+
+
+def read_cache_file(name):
+    try:
+        with open(os.path.join(cache_dir(), name), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def write_cache_file(name, data):
+    """Atomically write a JSON file into the cache directory (best effort)."""
+    directory = cache_dir()
+    try:
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=directory, prefix=".tmp-")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp, os.path.join(directory, name))
+    except OSError:
+        pass
+
+
+def cache_name(url):
+    return "etag-" + hashlib.sha256(url.encode("utf-8")).hexdigest()[:32] + ".json"
+
+
+def update_rate_limit(headers):
+    """Record X-RateLimit-* headers so later invocations can see the budget."""
+    remaining = headers.get("X-RateLimit-Remaining")
+    reset = headers.get("X-RateLimit-Reset")
+    if remaining is None or reset is None:
+        return
+    with _state_lock:
+        write_cache_file(RATE_LIMIT_FILE, {
+            "remaining": int(remaining),
+            "reset": int(reset),
+            "authenticated": github_token() is not None,
+        })
+
+
+def rate_limit_wait():
+    """Seconds until the recorded rate limit resets, or 0 if budget remains."""
+    state = read_cache_file(RATE_LIMIT_FILE)
+    if not state or state.get("remaining", 1) > 0:
+        return 0
+    # Budgets differ for anonymous and authenticated requests
+    if state.get("authenticated") != (github_token() is not None):
+        return 0
+    return max(0, state.get("reset", 0) - time.time())
 
 
 def fetch_json(url):
-    """Fetch JSON from URL."""
-    req = urllib.request.Request(url, headers={"Accept": "application/vnd.github.v3+json"})
+    """
+    Fetch JSON from the GitHub API, staying within its rate limit.
+
+    Uses a token from GITHUB_TOKEN/GH_TOKEN when set, sends conditional
+    requests with cached ETags (304 responses are free), and when the budget
+    is exhausted either waits for the reset (up to RATE_LIMIT_MAX_WAIT
+    seconds) or falls back to the cached response.
+    """
+    cached = read_cache_file(cache_name(url))
+    
+    wait = rate_limit_wait()
+    if wait > 0:
+        if cached is not None:
+            print(f"GitHub rate limit exhausted, using cached data for {url}", file=sys.stderr)
+            return cached["data"]
+        if wait > RATE_LIMIT_MAX_WAIT:
+            raise RuntimeError(
+                f"GitHub rate limit exhausted, resets in {int(wait)}s. "
+                f"Set GITHUB_TOKEN to raise the limit.")
+        print(f"GitHub rate limit exhausted, waiting {int(wait)}s...", file=sys.stderr)
+        time.sleep(wait)
+    
+    headers = {"Accept": "application/vnd.github.v3+json"}
+    token = github_token()
+    if token:
+        headers["Authorization"] = f"Bearer {token}"
+    if cached is not None and cached.get("etag"):
+        headers["If-None-Match"] = cached["etag"]
+    
+    req = urllib.request.Request(url, headers=headers)
     try:
-        with urllib.request.urlopen(req) as resp:
-            return json.loads(resp.read().decode("utf-8"))
+        with span("GET", kind="client", **{"url.full": url}) as s, urllib.request.urlopen(req) as resp:
+            update_rate_limit(resp.headers)
+            body = resp.read()
+            s.set("http.response.status_code", resp.status)
+            s.set("http.response.body.size", len(body))
+            data = json.loads(body.decode("utf-8"))
+            etag = resp.headers.get("ETag")
+            if etag:
+                write_cache_file(cache_name(url), {"etag": etag, "data": data})
+            return data
     except urllib.error.HTTPError as e:
+        update_rate_limit(e.headers)
+        if e.code == 304 and cached is not None:
+            return cached["data"]
         if e.code == 404:
             return None
+        if e.code in (403, 429) and e.headers.get("X-RateLimit-Remaining") == "0":
+            if cached is not None:
+                print(f"GitHub rate limit exhausted, using cached data for {url}", file=sys.stderr)
+                return cached["data"]
+            wait = rate_limit_wait()
+            if 0 < wait <= RATE_LIMIT_MAX_WAIT:
+                print(f"GitHub rate limit exhausted, waiting {int(wait)}s...", file=sys.stderr)
+                time.sleep(wait)
+                return fetch_json(url)
+            raise RuntimeError(
+                f"GitHub rate limit exhausted, resets in {int(wait)}s. "
+                f"Set GITHUB_TOKEN to raise the limit.") from e
         raise
 
 
 def fetch_text(url):
     """Fetch plain text from URL."""
     try:
-        with urllib.request.urlopen(url) as resp:
-            return resp.read().decode("utf-8")
+        with span("GET", kind="client", **{"url.full": url}) as s, urllib.request.urlopen(url) as resp:
+            body = resp.read()
+            s.set("http.response.body.size", len(body))
+            return body.decode("utf-8")
     except urllib.error.HTTPError as e:
         if e.code == 404:
             return None
         raise
 
 
-def list_directory(path, ref):
-    """List contents of a directory."""
-    url = f"{GITHUB_API}/{path}?ref={ref}"
-    data = fetch_json(url)
-    
-    if data is None:
-        print(f"Not found: {path}", file=sys.stderr)
-        return False
-    
-    if isinstance(data, dict) and data.get("type") == "file":
-        # It's a file, not a directory
-        print(f"{path} is a file, not a directory. Use without --list to view contents.", file=sys.stderr)
-        return False
-    
-    # Print directory listing
+def fetch_lines(url, start, end):
+    """
+    Stream plain text from URL and return lines start..end (1-based, inclusive).
+
+    Stops reading as soon as the range is passed, so only the prefix of the
+    file up to `end` is transferred. Returns a list of (lineno, line), or None
+    if the URL does not exist.
+    """
+    lines = []
+    try:
+        with span("GET", kind="client", **{"url.full": url, "lines.start": start, "lines.end": end}), \
+                urllib.request.urlopen(url) as resp:
+            for lineno, raw in enumerate(resp, 1):
+                if lineno > end:
+                    break
+                if lineno >= start:
+                    lines.append((lineno, raw.decode("utf-8", errors="replace").rstrip("\r\n")))
+    except urllib.error.HTTPError as e:
+        if e.code == 404:
+            return None
+        raise
+    return lines
+
+
+def format_listing(path, ref, data):
+    """Format a GitHub contents API directory listing."""
     dirs = []
     files = []
     
@@ -75,33 +253,146 @@ def list_directory(path, ref):
             size_str = f"{size:,} bytes" if size > 0 else ""
             files.append(f"  {name:<40} {size_str}")
     
-    print(f"Contents of {path} (ref: {ref}):\n")
+    lines = [f"Contents of {path} (ref: {ref}):", ""]
     
     if dirs:
-        print("Directories:")
-        for d in sorted(dirs):
-            print(d)
-        print()
+        lines.append("Directories:")
+        lines.extend(sorted(dirs))
+        lines.append("")
     
     if files:
-        print("Files:")
-        for f in sorted(files):
-            print(f)
+        lines.append("Files:")
+        lines.extend(sorted(files))
     
-    return True
+    return "\n".join(lines)
+
 
+def list_directory(path, ref):
+    """List contents of a directory. Returns (listing, error)."""
+    url = f"{GITHUB_API}/{path}?ref={ref}"
+    data = fetch_json(url)
+    
+    if data is None:
+        return None, f"Not found: {path}"
+    
+    if isinstance(data, dict) and data.get("type") == "file":
+        # It's a file, not a directory
+        return None, f"{path} is a file, not a directory. Use without --list to view contents."
+    
+    return format_listing(path, ref, data), None
 
-def get_file(path, ref):
-    """Get contents of a file."""
+
+def get_file(path, ref, start=None, end=None):
+    """
+    Get contents of a file, or only lines start..end with line numbers.
+
+    Returns (content, error).
+    """
     url = f"{GITHUB_RAW}/{ref}/{path}"
-    content = fetch_text(url)
     
-    if content is None:
-        print(f"Not found: {path}", file=sys.stderr)
-        return False
+    if start is None:
+        content = fetch_text(url)
+        if content is None:
+            return None, f"Not found: {path}"
+        return content, None
+    
+    lines = fetch_lines(url, start, end)
+    if lines is None:
+        return None, f"Not found: {path}"
+    if not lines:
+        return None, f"{path} has fewer than {start} lines"
     
-    print(content)
-    return True
+    return "\n".join(f"{lineno:6}\t{line}" for lineno, line in lines), None
+
+
+def parse_path(raw, context=None):
+    """
+    Split a path argument into (path, start, end).
+
+    Accepts "foo.nix", "foo.nix:42" and "foo.nix:10-20". A single line only
+    selects a range when `context` is given (lines 42-N .. 42+N); otherwise
+    the suffix is dropped and the whole file is fetched. start and end are
+    None when the whole file is wanted.
+    """
+    path = raw.strip().strip("/")
+    start = end = None
+    
+    name = path.split("/")[-1]
+    if ":" in name:
+        path, suffix = path.rsplit(":", 1)
+        match = LINE_RANGE_RE.match(suffix)
+        if match and match.group(2):
+            start, end = int(match.group(1)), int(match.group(2))
+        elif match and context is not None:
+            line = int(match.group(1))
+            start, end = line - context, line + context
+        if start is not None:
+            start = max(1, start)
+            end = max(start, end)
+    
+    return path, start, end
+
+
+def fetch_path(raw, ref, force_list=False, context=None):
+    """
+    Fetch a single path as either a file or a directory listing.
+
+    Returns a dict with path, ref, type ("file" or "dir"), start, end,
+    content and error.
+    """
+    path, start, end = parse_path(raw, context)
+    result = {"path": path, "ref": ref, "type": None, "start": start, "end": end,
+              "content": None, "error": None}
+    
+    try:
+        if force_list:
+            result["type"] = "dir"
+            content, error = list_directory(path, ref)
+        elif "." in path.split("/")[-1]:
+            # Looks like a file
+            result["type"] = "file"
+            content, error = get_file(path, ref, start, end)
+        else:
+            # Try as directory first
+            result["type"] = "dir"
+            content, error = list_directory(path, ref)
+            if content is None:
+                # Maybe it's a file without extension?
+                result["type"] = "file"
+                content, error = get_file(path, ref, start, end)
+    except (urllib.error.URLError, OSError, RuntimeError) as e:
+        content, error = None, f"Error fetching {path}: {e}"
+    
+    result["content"] = content
+    result["error"] = error
+    return result
+
+
+def fetch_paths(paths, ref, force_list=False, jobs=DEFAULT_JOBS, context=None):
+    """Fetch many paths concurrently, yielding results in input order."""
+    if len(paths) == 1:
+        yield fetch_path(paths[0], ref, force_list, context)
+        return
+    
+    with ThreadPoolExecutor(max_workers=max(1, min(jobs, len(paths)))) as pool:
+        yield from pool.map(lambda p: fetch_path(p, ref, force_list, context), paths)
+
+
+def read_paths(args_paths):
+    """Collect paths from arguments, reading stdin for "-" or when none are given."""
+    paths = []
+    use_stdin = not args_paths and not sys.stdin.isatty()
+    
+    for p in args_paths:
+        if p == "-":
+            use_stdin = True
+        else:
+            paths.append(p)
+    
+    if use_stdin:
+        paths.extend(line.strip() for line in sys.stdin if line.strip())
+    
+    return paths
 
 
 def main():
@@ -118,37 +409,64 @@ Examples:
   
   %(prog)s --ref nixos-24.11 pkgs/top-level/all-packages.nix
       Use specific branch
+  
+  %(prog)s pkgs/top-level/all-packages.nix:1000-1040
+      Show only lines 1000-1040, with line numbers
+  
+  %(prog)s --context 20 pkgs/top-level/all-packages.nix:1020
+      Show 20 lines of context around line 1020
+  
+  %(prog)s pkgs/by-name/he/hello/package.nix pkgs/by-name/he/hello/test.nix
+      Fetch several paths concurrently
+  
+  find-paths | %(prog)s --jsonl
+      Read paths from stdin, print one JSON object per path
 """
     )
-    parser.add_argument("path", help="Path in nixpkgs repo (e.g., pkgs/by-name/he/hello)")
+    parser.add_argument("paths", nargs="*", metavar="path",
+                        help="Path(s) in nixpkgs repo (e.g., pkgs/by-name/he/hello); "
+                             "'-' or no paths reads them from stdin")
     parser.add_argument("--ref", "-r", default=DEFAULT_REF,
                         help=f"Git ref (branch/tag), default: {DEFAULT_REF}")
     parser.add_argument("--list", "-l", action="store_true",
                         help="Force directory listing (auto-detected by default)")
+    parser.add_argument("--context", "-C", type=int, default=None,
+                        help="For path:LINE, show only N lines around LINE "
+                             "(without it the whole file is shown)")
+    parser.add_argument("--jobs", "-J", type=int, default=DEFAULT_JOBS,
+                        help=f"Maximum concurrent fetches, default: {DEFAULT_JOBS}")
+    parser.add_argument("--jsonl", action="store_true",
+                        help="Output one JSON object per path (path, ref, type, start, end, content, error)")
     
     args = parser.parse_args()
     
-    # Clean up path
-    path = args.path.strip("/")
-    
-    # Remove line number suffix if present (e.g., "foo.nix:42" -> "foo.nix")
-    if ":" in path.split("/")[-1]:
-        path = path.rsplit(":", 1)[0]
-    
-    if args.list:
-        success = list_directory(path, args.ref)
-    elif path.endswith(".nix") or path.endswith(".py") or path.endswith(".md") or "." in path.split("/")[-1]:
-        # Looks like a file
-        success = get_file(path, args.ref)
-    else:
-        # Try as directory first
-        success = list_directory(path, args.ref)
-        if not success:
-            # Maybe it's a file without extension?
-            success = get_file(path, args.ref)
+    paths = read_paths(args.paths)
+    if not paths:
+        parser.error("no paths given")
+    
+    success = True
+    for i, result in enumerate(fetch_paths(paths, args.ref, args.list, args.jobs, args.context)):
+        if result["error"]:
+            success = False
+        
+        if args.jsonl:
+            print(json.dumps(result), flush=True)
+            continue
+        
+        if len(paths) > 1:
+            # Delimit results like head(1) does for multiple files
+            if i > 0:
+                print()
+            print(f"==> {result['path']} <==", flush=True)
+        
+        if result["error"]:
+            print(result["error"], file=sys.stderr)
+        else:
+            print(result["content"], flush=True)
     
     sys.exit(0 if success else 1)
 
 
 if __name__ == "__main__":
-    main()
+    with span("nixpkgs_source"):
+        main()
@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+"""
+Offline NixOS option snapshots for search_nixos.py.
+
+A snapshot is one file per channel holding every option name, sorted and
+indexed, plus a compact record (type, default, example, declaration,
+description) per option. It is read through mmap, so prefix listings and
+exact lookups are binary searches that touch only the pages they need.
+search_nixos.py uses the snapshot automatically for --prefix and exact
+option lookups when one exists for the channel and is younger than
+SNAPSHOT_MAX_AGE.
+
+Build one from an options dump, e.g. the options.json produced by
+`nix-build '<nixpkgs/nixos/release.nix>' -A options` (under
+result/share/doc/nixos/), or from `search_nixos.py --ndjson` output:
+
+Usage:
+    option_snapshot.py build --channel unstable result/share/doc/nixos/options.json
+    option_snapshot.py build --channel 24.11 options.json.gz
+    option_snapshot.py prefix services.nginx.virtualHosts
+    option_snapshot.py info --channel unstable
+"""
+
+import os
+import sys
+import json
+import mmap
+import time
+import bisect
+import struct
+import argparse
+
+MAGIC = b"NIXOPTS\0"
+VERSION = 1
+# magic, version, count, built_at, index offset, names offset, records offset
+HEADER = struct.Struct("<8sIIQQQQ")
+# name offset, name length, record offset, record length (offsets relative to their section)
+ENTRY = struct.Struct("<IIQI")
+# Snapshots older than this are ignored in favour of the search API
+SNAPSHOT_MAX_AGE = 7 * 24 * 3600
+
+
+def snapshot_dir():
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+    return os.path.join(base, "nixos_search")
+
+
+def snapshot_path(channel):
+    return os.path.join(snapshot_dir(), f"options-{channel}.snap")
+
+
+def _text(value):
+    """Render an options.json value ({"_type": "literalExpression", "text": ...} or plain JSON) as text."""
+    if value is None:
+        return None
+    if isinstance(value, dict) and "text" in value:
+        return value["text"]
+    if isinstance(value, str):
+        return value
+    return json.dumps(value)
+
+
+def _declaration(declarations):
+    for declaration in declarations or []:
+        if isinstance(declaration, dict):
+            return declaration.get("name") or declaration.get("url") or ""
+        return declaration
+    return ""
+
+
+def read_dump(path):
+    """
+    Read options from a NixOS options.json (name -> option) or from
+    search_nixos.py --ndjson output (one option record per line).
+
+    Returns:
+        {name: record} with the fields of search_nixos.option_record
+    """
+    if path == "-":
+        data = sys.stdin.buffer.read()
+    else:
+        with open(path, "rb") as f:
+            data = f.read()
+    if path.endswith(".gz"):
+        import gzip
+        data = gzip.decompress(data)
+    elif path.endswith(".br"):
+        try:
+            import brotli
+        except ImportError:
+            raise RuntimeError("reading .br dumps needs the brotli module; decompress it with `brotli -d` first")
+        data = brotli.decompress(data)
+    text = data.decode("utf-8")
+
+    try:
+        dump = json.loads(text)
+    except ValueError:
+        dump = None
+    if isinstance(dump, dict):
+        options = {}
+        for name, option in dump.items():
+            options[name] = {
+                "type": option.get("type", "unknown"),
+                "default": _text(option.get("default")),
+                "example": _text(option.get("example")),
+                "declared_in": _declaration(option.get("declarations")),
+                "description": _text(option.get("description")) or "",
+            }
+        return options
+
+    options = {}
+    for line in text.splitlines():
+        if line.strip():
+            record = json.loads(line)
+            name = record.pop("name")
+            record.pop("channels", None)
+            options[name] = record
+    return options
+
+
+def write_snapshot(options, path):
+    """Write {name: record} as a snapshot file (atomically)."""
+    names = sorted(name.encode("utf-8") for name in options)
+    index = bytearray()
+    name_blob = bytearray()
+    records = bytearray()
+    for name in names:
+        record = json.dumps(options[name.decode("utf-8")], separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+        index += ENTRY.pack(len(name_blob), len(name), len(records), len(record))
+        name_blob += name
+        records += record
+
+    index_offset = HEADER.size
+    names_offset = index_offset + len(index)
+    records_offset = names_offset + len(name_blob)
+    header = HEADER.pack(MAGIC, VERSION, len(names), int(time.time()), index_offset, names_offset, records_offset)
+
+    import tempfile
+
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix=".tmp-")
+    with os.fdopen(fd, "wb") as f:
+        f.write(header)
+        f.write(index)
+        f.write(name_blob)
+        f.write(records)
+    os.replace(tmp, path)
+    return len(names)
+
+
+class Snapshot:
+    """A memory-mapped snapshot. Behaves as a sorted sequence of option names (bytes)."""
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.count, self.built_at, self.index_offset, self.names_offset, self.records_offset = \
+            HEADER.unpack_from(self.map, 0)
+        if magic != MAGIC or version != VERSION:
+            self.map.close()
+            raise ValueError(f"{path} is not a version {VERSION} option snapshot")
+
+    def close(self):
+        self.map.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return self.count
+
+    def _entry(self, i):
+        return ENTRY.unpack_from(self.map, self.index_offset + i * ENTRY.size)
+
+    def __getitem__(self, i):
+        name_offset, name_length, _, _ = self._entry(i)
+        start = self.names_offset + name_offset
+        return self.map[start:start + name_length]
+
+    def record(self, i):
+        """Name and record of the i-th option."""
+        _, _, record_offset, record_length = self._entry(i)
+        start = self.records_offset + record_offset
+        record = json.loads(self.map[start:start + record_length])
+        record["name"] = self[i].decode("utf-8")
+        return record
+
+    def prefix_range(self, prefix):
+        """Index range [lo, hi) of the names starting with prefix."""
+        key = prefix.encode("utf-8")
+        lo = bisect.bisect_left(self, key)
+        # 0xff never occurs in UTF-8, so it sorts after every continuation of the prefix
+        hi = bisect.bisect_left(self, key + b"\xff", lo)
+        return lo, hi
+
+    def lookup(self, name):
+        """Record of the option with exactly this name, or None."""
+        key = name.encode("utf-8")
+        i = bisect.bisect_left(self, key)
+        if i < self.count and self[i] == key:
+            return self.record(i)
+        return None
+
+
+def open_fresh(channel, max_age=SNAPSHOT_MAX_AGE):
+    """The channel's snapshot if it exists and is younger than max_age, else None."""
+    path = snapshot_path(channel)
+    try:
+        if time.time() - os.path.getmtime(path) > max_age:
+            return None
+        return Snapshot(path)
+    except (OSError, ValueError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Build and query offline NixOS option snapshots",
+        epilog="""Examples:
+  %(prog)s build --channel unstable result/share/doc/nixos/options.json
+  %(prog)s prefix services.nginx.virtualHosts
+  %(prog)s get services.nginx.enable
+  %(prog)s info --channel 24.11""",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    build = commands.add_parser("build", help="Build a snapshot from an options dump")
+    build.add_argument("dump", help="options.json (optionally .gz/.br), search_nixos.py --ndjson output, or - for stdin")
+
+    prefix = commands.add_parser("prefix", help="List option names starting with a prefix")
+    prefix.add_argument("prefix", nargs="?", default="")
+    prefix.add_argument("--size", "-n", type=int, default=0, help="Maximum number of names (default: all)")
+
+    get = commands.add_parser("get", help="Print one option record as JSON")
+    get.add_argument("name")
+
+    commands.add_parser("info", help="Show the snapshot's location, size and age")
+
+    for command in (build, prefix, get, commands.choices["info"]):
+        command.add_argument("--channel", "-c", default="unstable", help="NixOS channel (default: unstable)")
+    args = parser.parse_args()
+
+    path = snapshot_path(args.channel)
+    if args.command == "build":
+        try:
+            options = read_dump(args.dump)
+        except (OSError, ValueError, RuntimeError) as e:
+            print(f"Error reading {args.dump}: {e}", file=sys.stderr)
+            sys.exit(1)
+        count = write_snapshot(options, path)
+        print(f"Wrote {count} options to {path} ({os.path.getsize(path) / 1024 / 1024:.1f} MiB)")
+        return
+
+    try:
+        snapshot = Snapshot(path)
+    except (OSError, ValueError) as e:
+        print(f"Error: no snapshot for channel {args.channel}: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    with snapshot:
+        if args.command == "info":
+            age = time.time() - snapshot.built_at
+            fresh = "fresh" if time.time() - os.path.getmtime(path) <= SNAPSHOT_MAX_AGE else "stale"
+            print(f"{path}: {len(snapshot)} options, {os.path.getsize(path) / 1024 / 1024:.1f} MiB, "
+                  f"built {age / 3600:.1f}h ago ({fresh})")
+        elif args.command == "prefix":
+            lo, hi = snapshot.prefix_range(args.prefix)
+            if args.size:
+                hi = min(hi, lo + args.size)
+            out = sys.stdout.buffer
+            for i in range(lo, hi):
+                out.write(snapshot[i] + b"\n")
+        else:
+            record = snapshot.lookup(args.name)
+            if record is None:
+                print(f"Error: no option named {args.name}", file=sys.stderr)
+                sys.exit(1)
+            print(json.dumps(record, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,26 @@
 #!/usr/bin/env python3
+import os
 import sys
 import json
 import argparse
 import urllib.request
 import urllib.error
 import re
+import html
 import textwrap
+from concurrent.futures import ThreadPoolExecutor
+
+from nixpkgs_source import fetch_paths
+from option_snapshot import open_fresh
+try:
+    from tracing import span
+except ImportError:  # Tracing is optional; nixpkgs_source provides the no-op span
+    from nixpkgs_source import span
 
 # Configuration derived from reverse engineering search.nixos.org
 # These might change, so we keep them constants
-API_ENDPOINT = "https://search.nixos.org/backend"
+# (NIXOS_SEARCH_API points the script at a stand-in, see scripts/bench_nix_scripts.py)
+API_ENDPOINT = os.environ.get("NIXOS_SEARCH_API", "https://search.nixos.org/backend")
 # Default to unstable, but allow override
 DEFAULT_CHANNEL = "unstable"
 
@@ -21,6 +32,9 @@ INDICES = {
     "24.05": "latest-44-nixos-24.05",
 }
 
+# Lines of context shown around package_position with --with-source
+DEFAULT_SOURCE_CONTEXT = 15
+
 # Credentials (publicly exposed in their JS bundle)
 # User: aWVSALXpZv
 # Pass: X8gPHnzL52wFEekuxsfQ9cSh
@@ -134,94 +148,269 @@ def search(query, type="packages", channel="unstable", from_item=0, size=20):
     )
 
     try:
-        with urllib.request.urlopen(req) as response:
-            result = json.loads(response.read().decode('utf-8'))
+        with span("POST _search", kind="client", **{"url.full": url, "search.type": type, "search.channel": channel}) as s, \
+                urllib.request.urlopen(req) as response:
+            body = response.read()
+            s.set("http.response.status_code", response.status)
+            s.set("http.response.body.size", len(body))
+            result = json.loads(body.decode('utf-8'))
             return result
     except urllib.error.URLError as e:
         print(f"Error querying NixOS Search: {e}", file=sys.stderr)
         return None
 
+def search_snapshot(query, type, channel, size=20):
+    """Answer an options-prefix or exact option lookup from the channel's offline snapshot.
+
+    Returns a result shaped like the search API's, or None when there is no
+    fresh snapshot (or, for plain option searches, no option with exactly
+    that name) and the API should be asked instead.
+    """
+    if type not in ("options", "options-prefix"):
+        return None
+    snapshot = open_fresh(channel)
+    if snapshot is None:
+        return None
+    with snapshot:
+        if type == "options-prefix":
+            lo, hi = snapshot.prefix_range(query)
+            records = [snapshot.record(i) for i in range(lo, min(hi, lo + size))]
+            total = hi - lo
+        else:
+            record = snapshot.lookup(query)
+            if record is None:
+                return None
+            records, total = [record], 1
+    hits = [{"_source": {
+        "type": "option",
+        "option_name": r["name"],
+        "option_type": r.get("type"),
+        "option_default": r.get("default"),
+        "option_example": r.get("example"),
+        "option_source": r.get("declared_in"),
+        # Snapshot descriptions are plain text; escape them so strip_html leaves them as-is
+        "option_description": html.escape(r.get("description") or "", quote=False),
+    }} for r in records]
+    return {"snapshot": True, "hits": {"total": {"value": total}, "hits": hits}}
+
+def parse_channels(value):
+    """Expand a --channel value ("all", "unstable" or "unstable,24.11") into a list."""
+    if value == "all":
+        return list(INDICES)
+    return [c.strip() for c in value.split(",") if c.strip()]
+
+def search_channels(query, type, channels, size=20, use_snapshot=True):
+    """Run the same search against several channels concurrently.
+
+    Returns {channel: result}, with None for channels whose query failed.
+    """
+    def search_one(channel):
+        return (use_snapshot and search_snapshot(query, type, channel, size)) or search(query, type, channel, size=size)
+
+    with ThreadPoolExecutor(max_workers=len(channels)) as pool:
+        results = pool.map(search_one, channels)
+        return dict(zip(channels, results))
+
+def merge_hits(results_by_channel, search_type):
+    """Group hits from several channels by attribute/option name.
+
+    Returns a list of (name, {channel: hit}) ordered by each name's best
+    rank in any channel.
+    """
+    key = "package_attr_name" if search_type == "packages" else "option_name"
+    merged = {}
+    best_rank = {}
+    for channel, results in results_by_channel.items():
+        if not results:
+            continue
+        for rank, hit in enumerate(results.get("hits", {}).get("hits", [])):
+            name = hit["_source"].get(key, "Unknown")
+            merged.setdefault(name, {})[channel] = hit
+            best_rank[name] = min(rank, best_rank.get(name, rank))
+    return sorted(merged.items(), key=lambda item: best_rank[item[0]])
+
+def format_comparison(name, hits_by_channel, channels, search_type):
+    """Format one merged hit with its per-channel versions side by side."""
+    first = next(hits_by_channel[c] for c in channels if c in hits_by_channel)
+    if search_type != "packages":
+        available = ", ".join(c for c in channels if c in hits_by_channel)
+        return format_option(first).rstrip("\n") + f"\n  Channels: {available}\n"
+
+    source = first["_source"]
+    width = max(len(c) for c in channels)
+    lines = [f"## {name}"]
+    if source.get("package_description"):
+        lines.append(f"  {source['package_description']}")
+    for channel in channels:
+        hit = hits_by_channel.get(channel)
+        version = hit["_source"].get("package_pversion", "") if hit else "(not found)"
+        lines.append(f"  {channel + ':':<{width + 1}} {version}")
+    lines.append("")
+    return "\n".join(lines)
+
+# Precompiled patterns for converting option descriptions to text. Each
+# pass is a C-level substitution and is skipped when its marker is absent.
+PRE_CODE_RE = re.compile(r'<pre><code[^>]*>(.*?)</code></pre>', re.DOTALL)
+CODE_ATTR_RE = re.compile(r'<code\s[^>]*>')
+TAG_RE = re.compile(r'<[^>]+>')
+BLANK_LINES_RE = re.compile(r'\n{3,}')
+
+def _indent_block(match):
+    return '\n' + textwrap.indent(match.group(1), '    ')
+
 def strip_html(text):
     """Remove HTML tags and clean up the text."""
     if not text:
         return ""
-    # Remove <rendered-html> wrapper
-    text = re.sub(r'</?rendered-html>', '', text)
-    # Convert <code> to backticks
-    text = re.sub(r'<code[^>]*>(.*?)</code>', r'`\1`', text)
-    # Convert <pre><code> blocks to indented text
-    text = re.sub(r'<pre><code>(.*?)</code></pre>', lambda m: '\n' + textwrap.indent(m.group(1), '    '), text, flags=re.DOTALL)
-    # Remove other HTML tags
-    text = re.sub(r'<[^>]+>', '', text)
-    # Decode HTML entities
-    text = text.replace('&lt;', '<').replace('&gt;', '>').replace('&amp;', '&').replace('&quot;', '"')
-    # Clean up whitespace
-    text = re.sub(r'\n{3,}', '\n\n', text)
+    if '<' in text:
+        # Convert <pre><code> blocks to indented text
+        if '<pre>' in text:
+            text = PRE_CODE_RE.sub(_indent_block, text)
+        # Convert <code> to backticks
+        if '<code' in text:
+            text = text.replace('<code>', '`').replace('</code>', '`')
+            if '<code' in text:
+                text = CODE_ATTR_RE.sub('`', text)
+        # Remove other HTML tags (including the <rendered-html> wrapper)
+        text = TAG_RE.sub('', text)
+    if '&' in text:
+        text = html.unescape(text)
+    if '\n\n\n' in text:
+        text = BLANK_LINES_RE.sub('\n\n', text)
     return text.strip()
 
-def format_package(hit):
+def package_record(hit):
+    """Extract the fields shown for a package hit."""
     source = hit["_source"]
-    name = source.get("package_attr_name", source.get("package_pname", "Unknown"))
-    version = source.get("package_pversion", "")
-    desc = source.get("package_description", "")
-    programs = source.get("package_programs", [])
-    homepage = source.get("package_homepage", [])
     license_info = source.get("package_license", [])
-    position = source.get("package_position", "")  # e.g. "pkgs/applications/.../default.nix:42"
+    lic = license_info[0].get("fullName", license_info[0]) if isinstance(license_info, list) and license_info else license_info
+    if isinstance(lic, dict):
+        lic = lic.get("fullName", str(lic))
+    homepage = source.get("package_homepage", [])
+    record = {
+        "name": source.get("package_attr_name", source.get("package_pname", "Unknown")),
+        "version": source.get("package_pversion", ""),
+        "description": source.get("package_description", ""),
+        "position": source.get("package_position", ""),  # e.g. "pkgs/applications/.../default.nix:42"
+        "programs": source.get("package_programs", []),
+        "homepage": homepage[0] if isinstance(homepage, list) and homepage else homepage,
+        "license": lic,
+    }
+    if "nixpkgs_source" in hit:
+        record["source"] = hit["nixpkgs_source"]
+    return record
+
+def option_record(hit):
+    """Extract the fields shown for an option hit, with the description as plain text."""
+    source = hit["_source"]
+    return {
+        "name": source.get("option_name", "Unknown"),
+        "type": source.get("option_type", "unknown"),
+        "default": source.get("option_default", None),
+        "example": source.get("option_example", None),
+        "declared_in": source.get("option_source", ""),
+        "description": strip_html(source.get("option_description", "")),
+    }
+
+def format_package(hit):
+    record = package_record(hit)
     
-    lines = [f"## {name} ({version})"]
-    if desc:
-        lines.append(f"  {desc}")
-    if position:
-        lines.append(f"  Source: {position}")
-    if programs:
-        lines.append(f"  Programs: {', '.join(programs)}")
-    if homepage:
-        hp = homepage[0] if isinstance(homepage, list) else homepage
-        lines.append(f"  Homepage: {hp}")
-    if license_info:
-        lic = license_info[0].get("fullName", license_info[0]) if isinstance(license_info, list) and license_info else license_info
-        if isinstance(lic, dict):
-            lic = lic.get("fullName", str(lic))
-        lines.append(f"  License: {lic}")
+    lines = [f"## {record['name']} ({record['version']})"]
+    if record["description"]:
+        lines.append(f"  {record['description']}")
+    if record["position"]:
+        lines.append(f"  Source: {record['position']}")
+    if record["programs"]:
+        lines.append(f"  Programs: {', '.join(record['programs'])}")
+    if record["homepage"]:
+        lines.append(f"  Homepage: {record['homepage']}")
+    if record["license"]:
+        lines.append(f"  License: {record['license']}")
     lines.append("")
     return "\n".join(lines)
 
+def channel_ref(channel):
+    """Map a search channel to the nixpkgs git ref it is built from."""
+    return f"nixos-{channel if channel in INDICES else DEFAULT_CHANNEL}"
+
+def attach_sources(hits, channel, context):
+    """Fetch the source slice around each hit's package_position concurrently.
+
+    The fetch result (see nixpkgs_source.fetch_path) is stored on the hit
+    under "nixpkgs_source".
+    """
+    with_position = [hit for hit in hits if hit["_source"].get("package_position")]
+    positions = [hit["_source"]["package_position"] for hit in with_position]
+    if not positions:
+        return
+    for hit, result in zip(with_position, fetch_paths(positions, channel_ref(channel), context=context)):
+        hit["nixpkgs_source"] = result
+
+def format_source(hit):
+    result = hit["nixpkgs_source"]
+    if result["error"]:
+        return f"  Source unavailable: {result['error']}\n"
+    return textwrap.indent(result["content"], "    ") + "\n"
+
+def _format_value(lines, label, value):
+    # Format multiline values nicely
+    value_str = str(value)
+    if '\n' in value_str:
+        lines.append(f"  {label}:")
+        for line in value_str.split('\n'):
+            lines.append(f"    {line}")
+    else:
+        lines.append(f"  {label}: {value_str}")
+
 def format_option(hit):
-    source = hit["_source"]
-    name = source.get("option_name", "Unknown")
-    opt_type = source.get("option_type", "unknown")
-    default = source.get("option_default", None)
-    example = source.get("option_example", None)
-    desc = strip_html(source.get("option_description", ""))
-    src = source.get("option_source", "")
+    record = option_record(hit)
     
-    lines = [f"## {name}"]
-    lines.append(f"  Type: {opt_type}")
-    if default is not None:
-        # Format multiline defaults nicely
-        default_str = str(default)
-        if '\n' in default_str:
-            lines.append(f"  Default:")
-            for line in default_str.split('\n'):
-                lines.append(f"    {line}")
-        else:
-            lines.append(f"  Default: {default_str}")
-    if src:
-        lines.append(f"  Declared in: {src}")
-    if desc:
-        lines.append(f"  Description: {desc}")
-    if example is not None:
-        example_str = str(example)
-        if '\n' in example_str:
-            lines.append(f"  Example:")
-            for line in example_str.split('\n'):
-                lines.append(f"    {line}")
-        else:
-            lines.append(f"  Example: {example_str}")
+    lines = [f"## {record['name']}"]
+    lines.append(f"  Type: {record['type']}")
+    if record["default"] is not None:
+        _format_value(lines, "Default", record["default"])
+    if record["declared_in"]:
+        lines.append(f"  Declared in: {record['declared_in']}")
+    if record["description"]:
+        lines.append(f"  Description: {record['description']}")
+    if record["example"] is not None:
+        _format_value(lines, "Example", record["example"])
     lines.append("")
     return "\n".join(lines)
 
+def write_ndjson(record, out=sys.stdout):
+    """Write one compact JSON record per line."""
+    out.write(json.dumps(record, separators=(',', ':')))
+    out.write('\n')
+
+def compare_channels(query, search_type, channels, size, output, use_snapshot=True):
+    """Search several channels at once and print hits merged across them."""
+    results_by_channel = search_channels(query, search_type, channels, size=size, use_snapshot=use_snapshot)
+    if not any(results_by_channel.values()):
+        sys.exit(1)
+
+    if output == "json":
+        print(json.dumps(results_by_channel, indent=2))
+        return
+
+    merged = merge_hits(results_by_channel, search_type)
+    if output == "ndjson":
+        to_record = package_record if search_type == "packages" else option_record
+        for name, hits_by_channel in merged:
+            write_ndjson({
+                "name": name,
+                "channels": {c: to_record(hits_by_channel[c]) for c in channels if c in hits_by_channel},
+            })
+        return
+
+    failed = [c for c, r in results_by_channel.items() if not r]
+    print(f"Found {len(merged)} results for '{query}' across {', '.join(channels)}:\n")
+    if failed:
+        print(f"(no results from: {', '.join(failed)})\n")
+
+    for name, hits_by_channel in merged:
+        print(format_comparison(name, hits_by_channel, channels, search_type))
+
 def main():
     parser = argparse.ArgumentParser(
         description="Search NixOS packages and options",
@@ -230,6 +419,9 @@ def main():
   %(prog)s --type options services.ssh  # Search for options matching 'services.ssh'
   %(prog)s --prefix services.postgresql # List all options under services.postgresql.*
   %(prog)s --size 50 nginx              # Get up to 50 results
+  %(prog)s --with-source -n 3 hello     # Include the source around each definition
+  %(prog)s --channel all nodejs         # Compare versions across all channels
+  %(prog)s --ndjson --prefix services.nginx -n 500  # One compact JSON record per option
 """
     )
     parser.add_argument("query", help="Search term or prefix")
@@ -238,11 +430,20 @@ def main():
     parser.add_argument("--prefix", "-p", action="store_true",
                         help="Search options by prefix (lists all options starting with query)")
     parser.add_argument("--channel", "-c", default="unstable", 
-                        help="NixOS channel (unstable, 24.11, 24.05)")
+                        help="NixOS channel (unstable, 24.11, 24.05), a comma list, or 'all' to compare")
     parser.add_argument("--size", "-n", type=int, default=20,
                         help="Number of results to return (default: 20)")
-    parser.add_argument("--json", "-j", action="store_true", 
+    output = parser.add_mutually_exclusive_group()
+    output.add_argument("--json", "-j", action="store_const", const="json", dest="output",
                         help="Output raw JSON from the API")
+    output.add_argument("--ndjson", action="store_const", const="ndjson", dest="output",
+                        help="Output one compact JSON record per hit, written as it is formatted")
+    parser.add_argument("--with-source", "-s", action="store_true",
+                        help="Also fetch the nixpkgs source around each package's definition")
+    parser.add_argument("--context", "-C", type=int, default=DEFAULT_SOURCE_CONTEXT,
+                        help=f"Lines of source context for --with-source (default: {DEFAULT_SOURCE_CONTEXT})")
+    parser.add_argument("--no-snapshot", action="store_true",
+                        help="Always query the API, even when a fresh option snapshot exists (see option_snapshot.py)")
     
     args = parser.parse_args()
     
@@ -250,25 +451,52 @@ def main():
     search_type = args.type
     if args.prefix:
         search_type = "options-prefix"
+    if args.with_source and search_type != "packages":
+        parser.error("--with-source only applies to package searches")
 
-    results = search(args.query, search_type, args.channel, size=args.size)
+    channels = parse_channels(args.channel)
+    if len(channels) > 1:
+        unknown = [c for c in channels if c not in INDICES]
+        if unknown:
+            parser.error(f"unknown channel(s): {', '.join(unknown)} (known: {', '.join(INDICES)})")
+        if args.with_source:
+            parser.error("--with-source only applies to a single channel")
+        compare_channels(args.query, search_type, channels, args.size, args.output, not args.no_snapshot)
+        return
+
+    results = None
+    if not args.no_snapshot:
+        results = search_snapshot(args.query, search_type, args.channel, size=args.size)
+    if results is None:
+        results = search(args.query, search_type, args.channel, size=args.size)
     
     if not results:
         sys.exit(1)
 
-    if args.json:
+    if args.with_source:
+        attach_sources(results.get("hits", {}).get("hits", []), args.channel, args.context)
+
+    if args.output == "json":
         print(json.dumps(results, indent=2))
+    elif args.output == "ndjson":
+        to_record = package_record if search_type == "packages" else option_record
+        for hit in results.get("hits", {}).get("hits", []):
+            write_ndjson(to_record(hit))
     else:
         hits = results.get("hits", {}).get("hits", [])
         total = results.get("hits", {}).get("total", {}).get("value", 0)
         
-        print(f"Found {total} results for '{args.query}' (showing {len(hits)}):\n")
+        origin = " from the offline snapshot" if results.get("snapshot") else ""
+        print(f"Found {total} results for '{args.query}'{origin} (showing {len(hits)}):\n")
         
         for hit in hits:
             if search_type == "packages":
                 print(format_package(hit))
+                if args.with_source and hit.get("nixpkgs_source"):
+                    print(format_source(hit))
             else:
                 print(format_option(hit))
 
 if __name__ == "__main__":
-    main()
+    with span("search_nixos"):
+        main()
@@ -0,0 +1,348 @@
+#!/usr/bin/env python3
+"""
+OpenTelemetry Collector component catalog.
+
+`build` parses every metadata.yaml under references/components (in
+parallel, re-parsing only files that changed since the last build) into
+references/catalog.json: one record per component with its class, name,
+stability per signal, distributions, README and example config paths.
+`list` and `show` answer questions from the catalog without opening the
+YAML files.
+
+Usage:
+  ./scripts/component_catalog.py build
+  ./scripts/component_catalog.py list --class exporter --signal logs --stability stable
+  ./scripts/component_catalog.py list --distribution k8s kafka
+  ./scripts/component_catalog.py show otlphttp
+"""
+import os
+import re
+import sys
+import json
+import hashlib
+import argparse
+
+SKILL_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+COMPONENTS_DIR = os.path.join(SKILL_DIR, "references", "components")
+CATALOG_PATH = os.path.join(SKILL_DIR, "references", "catalog.json")
+CATALOG_VERSION = 2
+
+CLASSES = ("receiver", "processor", "exporter", "connector", "extension")
+# Most to least mature; used to order and compare stability levels
+STABILITY_LEVELS = ("stable", "beta", "alpha", "development", "deprecated", "unmaintained")
+CONFIG_RE = re.compile(r'^config.*\.ya?ml$')
+KEY_RE = re.compile(r'^([A-Za-z0-9_.-]+):(?:[ \t]+(.*))?$')
+
+
+def parse_scalar(value):
+    value = value.strip()
+    if len(value) >= 2 and value[0] == value[-1] and value[0] in "\"'":
+        return value[1:-1]
+    return value
+
+
+def parse_flow_list(value):
+    return [parse_scalar(item) for item in value.strip()[1:-1].split(",") if item.strip()]
+
+
+def strip_comment(line):
+    if "#" not in line:
+        return line
+    quote = None
+    for i, c in enumerate(line):
+        if quote:
+            if c == quote:
+                quote = None
+        elif c in "\"'":
+            quote = c
+        elif c == "#" and (i == 0 or line[i - 1] in " \t"):
+            return line[:i]
+    return line
+
+
+def parse_block(lines, start, indent):
+    """
+    Parse the nested mappings / lists indented deeper than `indent`,
+    starting at lines[start]. Returns (value, next index).
+    """
+    result = None
+    i = start
+    while i < len(lines):
+        depth, text = lines[i]
+        if depth <= indent:
+            break
+        if text.startswith("- ") or text == "-":
+            if result is None:
+                result = []
+            if not isinstance(result, list):
+                break
+            result.append(parse_scalar(text[1:]))
+            i += 1
+            continue
+        match = KEY_RE.match(text)
+        if not match:
+            i += 1
+            continue
+        if result is None:
+            result = {}
+        if not isinstance(result, dict):
+            break
+        key, value = match.group(1), (match.group(2) or "").strip()
+        i += 1
+        if value.startswith("["):
+            result[key] = parse_flow_list(value)
+        elif value and value not in ("|", ">", "|-", ">-"):
+            result[key] = parse_scalar(value)
+        elif i < len(lines) and lines[i][0] == depth and lines[i][1].startswith("-"):
+            # Block list written at the same indentation as its key
+            result[key], i = parse_block(lines, i, depth - 1)
+        else:
+            result[key], i = parse_block(lines, i, depth)
+    return result, i
+
+
+def parse_metadata(text):
+    """
+    Extract `type`, `parent` and the `status` block from a collector
+    metadata.yaml. Other top-level keys (attributes, metrics, ...) are skipped
+    without being parsed.
+    """
+    lines = []
+    for raw in text.splitlines():
+        line = strip_comment(raw).rstrip()
+        if line.strip():
+            lines.append((len(line) - len(line.lstrip(" ")), line.strip()))
+
+    metadata = {}
+    i = 0
+    while i < len(lines):
+        depth, text = lines[i]
+        i += 1
+        if depth:
+            continue
+        match = KEY_RE.match(text)
+        if not match:
+            continue
+        key, value = match.group(1), (match.group(2) or "").strip()
+        if key in ("type", "parent") and value:
+            metadata[key] = parse_scalar(value)
+        elif key == "status" and not value:
+            metadata["status"], i = parse_block(lines, i, 0)
+    return metadata
+
+
+def component_record(relpath, text):
+    """Catalog record for one metadata.yaml (relpath relative to the components directory)."""
+    metadata = parse_metadata(text)
+    status = metadata.get("status") if isinstance(metadata.get("status"), dict) else {}
+    directory = os.path.dirname(relpath)
+
+    stability = {}
+    for level, signals in (status.get("stability") or {}).items():
+        for signal in signals if isinstance(signals, list) else [signals]:
+            stability[signal] = level
+
+    distributions = status.get("distributions") or []
+    return {
+        "class": status.get("class") or directory.split("/")[0],
+        "name": metadata.get("type") or os.path.basename(directory),
+        "parent": metadata.get("parent"),
+        "path": directory,
+        "stability": stability,
+        "distributions": distributions if isinstance(distributions, list) else [distributions],
+    }
+
+
+def file_digest(path):
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def parse_file(args):
+    relpath, path = args
+    with open(path, "rb") as f:
+        data = f.read()
+    record = component_record(relpath, data.decode("utf-8", "replace"))
+    return relpath, record, hashlib.sha256(data).hexdigest()
+
+
+def load_catalog(catalog_path=CATALOG_PATH):
+    try:
+        with open(catalog_path, "r", encoding="utf-8") as f:
+            catalog = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return catalog if catalog.get("version") == CATALOG_VERSION else None
+
+
+def scan_components(components_dir):
+    """
+    Walk the components tree once.
+
+    Returns:
+        ({metadata relpath: (path, size, mtime_ns)}, {component dir: [config relpaths]}, {component dir: README relpath})
+    """
+    metadata, configs, readmes = {}, {}, {}
+    for dirpath, dirnames, filenames in os.walk(components_dir):
+        dirnames.sort()
+        reldir = os.path.relpath(dirpath, components_dir).replace(os.sep, "/")
+        if "metadata.yaml" in filenames:
+            path = os.path.join(dirpath, "metadata.yaml")
+            st = os.stat(path)
+            metadata[f"{reldir}/metadata.yaml"] = (path, st.st_size, st.st_mtime_ns)
+        if "README.md" in filenames:
+            readmes[reldir] = f"{reldir}/README.md"
+        if os.path.basename(dirpath) == "testdata":
+            owner = os.path.dirname(reldir)
+            for name in sorted(filenames):
+                if CONFIG_RE.match(name):
+                    configs.setdefault(owner, []).append(f"{reldir}/{name}")
+    return metadata, configs, readmes
+
+
+def build_catalog(components_dir=COMPONENTS_DIR, catalog_path=CATALOG_PATH, jobs=None):
+    """
+    Write catalog.json, re-parsing only metadata.yaml files whose content
+    changed since the previous build. Files with an unchanged size and mtime
+    are reused without being read; otherwise a matching sha256 is enough, as
+    a sync rewrites every file with a new mtime.
+
+    Returns:
+        (files parsed, files reused, components)
+    """
+    metadata, configs, readmes = scan_components(components_dir)
+    previous = load_catalog(catalog_path) or {}
+    old_sources = previous.get("sources", {})
+    old_records = {c["path"] + "/metadata.yaml": c for c in previous.get("components", [])}
+
+    records = {}
+    digests = {}
+    stale = []
+    for relpath, (path, size, mtime) in metadata.items():
+        old = old_sources.get(relpath)
+        if old and relpath in old_records and old[0] == size:
+            digest = old[2] if old[1] == mtime else file_digest(path)
+            if digest == old[2]:
+                records[relpath] = {k: v for k, v in old_records[relpath].items() if k not in ("configs", "readme")}
+                digests[relpath] = digest
+                continue
+        stale.append((relpath, path))
+
+    if len(stale) > 1 and jobs != 1:
+        # Imported lazily; process pools are only worth it for a cold build
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            parsed = list(pool.map(parse_file, stale, chunksize=32))
+    else:
+        parsed = list(map(parse_file, stale))
+    for relpath, record, digest in parsed:
+        records[relpath] = record
+        digests[relpath] = digest
+
+    components = []
+    for relpath, record in sorted(records.items()):
+        record["readme"] = readmes.get(record["path"])
+        record["configs"] = configs.get(record["path"], [])
+        components.append(record)
+
+    catalog = {
+        "version": CATALOG_VERSION,
+        "components": components,
+        "sources": {relpath: [size, mtime, digests[relpath]] for relpath, (_, size, mtime) in sorted(metadata.items())},
+    }
+    tmp = catalog_path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(catalog, f, indent=1, sort_keys=True)
+    os.replace(tmp, catalog_path)
+    return len(stale), len(records) - len(stale), len(components)
+
+
+def matches(component, cls=None, signal=None, stability=None, distribution=None, name=None):
+    if cls and component["class"] != cls:
+        return False
+    if name and name.lower() not in component["name"].lower():
+        return False
+    if distribution and distribution not in component["distributions"]:
+        return False
+    levels = component["stability"]
+    if signal:
+        # Connectors list signal pairs such as traces_to_metrics
+        levels = {s: l for s, l in levels.items() if s == signal or signal in s.split("_to_")}
+        if not levels:
+            return False
+    if stability and not any(l in stability for l in levels.values()):
+        return False
+    return True
+
+
+def format_stability(stability):
+    order = {level: i for i, level in enumerate(STABILITY_LEVELS)}
+    items = sorted(stability.items(), key=lambda item: (order.get(item[1], len(order)), item[0]))
+    return ", ".join(f"{signal}:{level}" for signal, level in items) or "-"
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Catalog of OpenTelemetry Collector components built from their metadata.yaml",
+        epilog="""Examples:
+  component_catalog.py build
+  component_catalog.py list --class exporter --signal logs --stability stable
+  component_catalog.py show filelog""",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    build = commands.add_parser("build", help="Build or update references/catalog.json")
+    build.add_argument("--jobs", "-j", type=int, default=None, help="Parser processes for changed files (default: CPU count)")
+
+    listing = commands.add_parser("list", help="List components matching the filters")
+    listing.add_argument("name", nargs="?", help="Only components whose name contains this")
+    listing.add_argument("--class", "-c", dest="cls", choices=CLASSES, help="Component class")
+    listing.add_argument("--signal", "-s", help="Signal (traces, metrics, logs, profiles)")
+    listing.add_argument("--stability", "-S", help="Comma-separated stability levels, e.g. stable,beta")
+    listing.add_argument("--distribution", "-d", help="Distribution, e.g. contrib, k8s, core")
+    listing.add_argument("--json", action="store_true", help="Output matching records as JSON lines")
+
+    show = commands.add_parser("show", help="Show one component's record")
+    show.add_argument("name", help="Component name (its metadata.yaml type)")
+    show.add_argument("--class", "-c", dest="cls", choices=CLASSES, help="Component class")
+    args = parser.parse_args()
+
+    if args.command == "build":
+        if not os.path.isdir(COMPONENTS_DIR):
+            print(f"Error: {COMPONENTS_DIR} not found; sync the references first", file=sys.stderr)
+            sys.exit(1)
+        parsed, reused, total = build_catalog(jobs=args.jobs)
+        print(f"{os.path.relpath(CATALOG_PATH)}: {total} components ({parsed} parsed, {reused} unchanged)")
+        return
+
+    catalog = load_catalog()
+    if catalog is None:
+        print(f"Error: {CATALOG_PATH} not found; run `component_catalog.py build`", file=sys.stderr)
+        sys.exit(1)
+
+    if args.command == "show":
+        found = [c for c in catalog["components"]
+                 if c["name"] == args.name and (not args.cls or c["class"] == args.cls)]
+        if not found:
+            print(f"Error: no component named {args.name}", file=sys.stderr)
+            sys.exit(1)
+        for component in found:
+            print(json.dumps(component, indent=2))
+        return
+
+    stability = set(args.stability.split(",")) if args.stability else None
+    found = [c for c in catalog["components"]
+             if matches(c, args.cls, args.signal, stability, args.distribution, args.name)]
+    if args.json:
+        for component in found:
+            print(json.dumps(component))
+        return
+    for component in found:
+        print(f"{component['class']:<10} {component['name']:<28} {format_stability(component['stability']):<48} "
+              f"{','.join(component['distributions']) or '-'}")
+    print(f"\n{len(found)} components")
+
+
+if __name__ == "__main__":
+    main()
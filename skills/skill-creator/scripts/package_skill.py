@@ -4,25 +4,81 @@ Skill Packager - Creates a distributable .skill file of a skill folder
 
 Usage:
     python utils/package_skill.py <path/to/skill-folder> [output-directory]
+    python utils/package_skill.py --all <skills-root> [output-directory]
 
 Example:
     python utils/package_skill.py skills/public/my-skill
     python utils/package_skill.py skills/public/my-skill ./dist
+    python utils/package_skill.py --all skills/public ./dist
 """
 
+import io
+import os
 import sys
+import json
+import time
+import zlib
+import struct
+import hashlib
+import argparse
 import zipfile
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import redirect_stdout
 from pathlib import Path
 from quick_validate import validate_skill
+from skillignore import walk_files
+try:
+    from tracing import span, flush
+except ImportError:  # Tracing is optional; tracing.py lives in the repository's scripts/
+    class _NoopSpan:
+        def __enter__(self):
+            return self
 
+        def __exit__(self, *exc):
+            return False
 
-def package_skill(skill_path, output_dir=None):
+        def set(self, key, value):
+            pass
+
+        def error(self, message):
+            pass
+
+    def span(name, kind="internal", **attributes):
+        return _NoopSpan()
+
+    def flush():
+        pass
+
+
+# Earliest timestamp a zip member can carry; used so identical content
+# always produces identical archives
+ZIP_EPOCH = (1980, 1, 1, 0, 0, 0)
+MANIFEST_VERSION = 1
+
+DEFAULT_LEVEL = 6
+# Files smaller than this are stored; deflate overhead outweighs the savings
+MIN_DEFLATE_SIZE = 128
+# Formats that are already compressed and would not shrink further
+PRECOMPRESSED_SUFFIXES = {
+    '.png', '.jpg', '.jpeg', '.gif', '.webp', '.avif', '.ico',
+    '.zip', '.skill', '.jar', '.gz', '.tgz', '.bz2', '.xz', '.zst', '.7z', '.rar',
+    '.woff', '.woff2',
+    '.mp3', '.mp4', '.m4a', '.ogg', '.webm', '.mov',
+    '.docx', '.xlsx', '.pptx', '.odt', '.epub',
+}
+
+
+def package_skill(skill_path, output_dir=None, level=DEFAULT_LEVEL, threads=None, verbosity="progress"):
     """
     Package a skill folder into a .skill file.
 
     Args:
         skill_path: Path to the skill folder
         output_dir: Optional output directory for the .skill file (defaults to current directory)
+        level: Deflate level 0-9 (0 stores every file uncompressed)
+        threads: Worker threads used to compress members (defaults to the CPU count)
+        verbosity: "verbose" prints a line per file, "progress" a running
+            counter on terminals, "quiet" only the result
 
     Returns:
         Path to the created .skill file, or None if error
@@ -46,7 +102,8 @@ def package_skill(skill_path, output_dir=None):
 
     # Run validation before packaging
     print("🔍 Validating skill...")
-    valid, message = validate_skill(skill_path)
+    with span("validate"):
+        valid, message = validate_skill(skill_path)
     if not valid:
         print(f"❌ Validation failed: {message}")
         print("   Please fix the validation errors before packaging.")
@@ -62,17 +119,30 @@ def package_skill(skill_path, output_dir=None):
         output_path = Path.cwd()
 
     skill_filename = output_path / f"{skill_name}.skill"
+    manifest_filename = output_path / f"{skill_name}.skill.manifest.json"
 
     # Create the .skill file (zip format)
     try:
-        with zipfile.ZipFile(skill_filename, 'w', zipfile.ZIP_DEFLATED) as zipf:
-            # Walk through the skill directory
-            for file_path in skill_path.rglob('*'):
-                if file_path.is_file():
-                    # Calculate the relative path within the zip
-                    arcname = file_path.relative_to(skill_path.parent)
-                    zipf.write(file_path, arcname)
-                    print(f"  Added: {arcname}")
+        with span("collect files") as s:
+            files = collect_files(skill_path)
+            s.set("files", len(files))
+        with span("build manifest"):
+            manifest = build_manifest(files, level)
+        previous = load_manifest(manifest_filename)
+
+        # Identical inputs: the previous archive is byte-for-byte what we would build
+        if (previous and skill_filename.exists()
+                and {k: v for k, v in previous.items() if k != "archive"} == manifest
+                and previous.get("archive") == hash_file(skill_filename)):
+            print(f"♻️  Unchanged since last build, reusing: {skill_filename}")
+            return skill_filename
+
+        with span("write archive", **{"compression.level": level}) as s:
+            write_archive(skill_filename, files, manifest, previous, threads, verbosity)
+            s.set("archive.size", skill_filename.stat().st_size)
+
+        manifest["archive"] = hash_file(skill_filename)
+        manifest_filename.write_text(json.dumps(manifest, indent=2, sort_keys=True) + "\n")
 
         print(f"\n✅ Successfully packaged skill to: {skill_filename}")
         return skill_filename
@@ -82,23 +152,382 @@ def package_skill(skill_path, output_dir=None):
         return None
 
 
+def zip_date_time():
+    """Timestamp stored for every member: SOURCE_DATE_EPOCH if set, else 1980-01-01."""
+    epoch = os.environ.get("SOURCE_DATE_EPOCH")
+    if epoch:
+        return max(ZIP_EPOCH, tuple(time.gmtime(int(epoch))[:6]))
+    return ZIP_EPOCH
+
+
+def collect_files(skill_path):
+    """
+    Return (arcname, path) for every file in the skill that is not excluded
+    by .skillignore or the default ignore rules, sorted by arcname.
+    """
+    # The zip keeps the skill folder itself as the top-level directory
+    return [(f"{skill_path.name}/{relpath}", file_path) for relpath, file_path in walk_files(skill_path)]
+
+
+def hash_file(path):
+    """SHA-256 hex digest of a file's contents."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def build_manifest(files, level=DEFAULT_LEVEL):
+    """
+    Describe the archive that files would produce: per-file content hashes,
+    sizes and normalized modes, plus the settings that affect its bytes.
+    """
+    entries = {}
+    for arcname, file_path in files:
+        st = file_path.stat()
+        entries[arcname] = {
+            "sha256": hash_file(file_path),
+            "size": st.st_size,
+            "mode": 0o755 if st.st_mode & 0o111 else 0o644,
+        }
+    return {
+        "version": MANIFEST_VERSION,
+        "date_time": list(zip_date_time()),
+        "level": level,
+        "files": entries,
+    }
+
+
+def load_manifest(manifest_filename):
+    """Load the manifest written by the previous build, if it is usable."""
+    try:
+        manifest = json.loads(manifest_filename.read_text())
+    except (OSError, ValueError):
+        return None
+    if not isinstance(manifest, dict) or manifest.get("version") != MANIFEST_VERSION:
+        return None
+    return manifest
+
+
+def read_raw_member(fp, zinfo):
+    """Read a member's compressed bytes as stored in the archive."""
+    fp.seek(zinfo.header_offset)
+    header = fp.read(30)
+    name_len, extra_len = struct.unpack('<HH', header[26:30])
+    fp.seek(zinfo.header_offset + 30 + name_len + extra_len)
+    return fp.read(zinfo.compress_size)
+
+
+def write_raw_member(zipf, zinfo, raw):
+    """
+    Append an already-deflated member to a ZipFile opened for writing.
+
+    zipfile has no public API for pre-compressed bytes, so this goes through
+    ZipFile internals; only call it when raw_writes_supported() is true.
+    """
+    if getattr(zipf, '_writing', False) or not getattr(zipf, '_seekable', False):
+        raise ValueError("raw members need a seekable archive with no other member open for writing")
+    zinfo.compress_size = len(raw)
+    zinfo.header_offset = zipf.fp.tell()
+    zipf.fp.write(zinfo.FileHeader())
+    zipf.fp.write(raw)
+    zipf.filelist.append(zinfo)
+    zipf.NameToInfo[zinfo.filename] = zinfo
+    # ZipFile writes the central directory at start_dir on close
+    zipf.start_dir = zipf.fp.tell()
+
+
+def deflate(data, level=DEFAULT_LEVEL):
+    """Raw deflate stream, as stored in zip members."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, -15)
+    return compressor.compress(data) + compressor.flush()
+
+
+_raw_writes = None
+
+
+def raw_writes_supported():
+    """
+    Whether write_raw_member() works with this Python's zipfile. Checked once
+    per process by writing a deflated member between regular ones into an
+    in-memory archive and reading it back through testzip().
+    """
+    global _raw_writes
+    if _raw_writes is None:
+        data = b"skill " * 64
+        buffer = io.BytesIO()
+        try:
+            with zipfile.ZipFile(buffer, 'w') as zipf:
+                zipf.writestr("before", data)
+                zinfo = zipfile.ZipInfo("raw", date_time=ZIP_EPOCH)
+                zinfo.compress_type = zipfile.ZIP_DEFLATED
+                zinfo.CRC, zinfo.file_size = zlib.crc32(data), len(data)
+                write_raw_member(zipf, zinfo, deflate(data))
+                zipf.writestr("after", data)
+            with zipfile.ZipFile(buffer) as zipf:
+                _raw_writes = (zipf.testzip() is None
+                               and all(zipf.read(name) == data for name in ("before", "raw", "after")))
+        except Exception:
+            _raw_writes = False
+    return _raw_writes
+
+
+def compress_member(arcname, file_path, level, raw_writes=True):
+    """
+    Read a file and pick how to store it: files that are already compressed,
+    too small to benefit, or that do not shrink are stored as-is. Without
+    raw_writes the uncompressed bytes are returned for deflated members too,
+    for zipfile to compress them itself.
+
+    Returns:
+        (compress_type, CRC-32, uncompressed size, bytes to write)
+    """
+    data = file_path.read_bytes()
+    crc = zlib.crc32(data)
+    if (level == 0 or len(data) < MIN_DEFLATE_SIZE
+            or Path(arcname).suffix.lower() in PRECOMPRESSED_SUFFIXES):
+        return zipfile.ZIP_STORED, crc, len(data), data
+    raw = deflate(data, level)
+    if len(raw) >= len(data):
+        return zipfile.ZIP_STORED, crc, len(data), data
+    return zipfile.ZIP_DEFLATED, crc, len(data), raw if raw_writes else data
+
+
+def write_member(zipf, zinfo, payload, level, raw_writes):
+    """
+    Write a member as chosen by compress_member(). Stored members, and all
+    members when raw writes are unsupported, go through zipfile's own writer.
+    """
+    if zinfo.compress_type == zipfile.ZIP_DEFLATED and raw_writes:
+        write_raw_member(zipf, zinfo, payload)
+    else:
+        zipf.writestr(zinfo, payload, compress_type=zinfo.compress_type, compresslevel=level)
+
+
+def write_archive(skill_filename, files, manifest, previous=None, threads=None, verbosity="progress"):
+    """
+    Write a reproducible .skill archive: sorted members, fixed timestamps and
+    normalized permissions. Members whose content hash matches the previous
+    manifest are copied from the previous archive without recompressing; the
+    rest are compressed in worker threads and written in order. If this
+    Python's zipfile cannot take pre-compressed members, zipfile deflates
+    them itself and reused members are decompressed and rewritten.
+    """
+    old_files = previous["files"] if previous else {}
+    old_zip = None
+    if (previous and skill_filename.exists()
+            and previous.get("date_time") == manifest["date_time"]
+            and previous.get("level") == manifest["level"]):
+        try:
+            old_zip = zipfile.ZipFile(skill_filename)
+        except zipfile.BadZipFile:
+            old_zip = None
+
+    def reusable(arcname):
+        old = old_zip.NameToInfo.get(arcname) if old_zip else None
+        if old is not None and old_files.get(arcname, {}).get("sha256") == manifest["files"][arcname]["sha256"]:
+            return old
+        return None
+
+    show_progress = verbosity == "progress" and sys.stdout.isatty()
+    counts = {"added": 0, "reused": 0, "stored": 0}
+
+    def report(index, line):
+        if verbosity == "verbose":
+            print(line)
+        elif show_progress:
+            print(f"\r  [{index}/{len(files)}] files", end="", flush=True)
+
+    level = manifest["level"]
+    raw_writes = raw_writes_supported()
+    tmp_filename = skill_filename.with_name(skill_filename.name + ".tmp")
+    try:
+        workers = threads or os.cpu_count()
+        with zipfile.ZipFile(tmp_filename, 'w') as zipf, ThreadPoolExecutor(max_workers=workers) as pool:
+            # zlib releases the GIL, so changed members deflate in parallel. Only
+            # a window of them is in flight at a time, so memory is bounded by a
+            # few members rather than the whole compressed skill.
+            changed = iter([(arcname, file_path) for arcname, file_path in files if reusable(arcname) is None])
+            pending = {}
+
+            def submit_ahead():
+                while len(pending) < 2 * workers:
+                    item = next(changed, None)
+                    if item is None:
+                        return
+                    pending[item[0]] = pool.submit(compress_member, item[0], item[1], level, raw_writes)
+
+            submit_ahead()
+            for index, (arcname, file_path) in enumerate(files, 1):
+                entry = manifest["files"][arcname]
+                zinfo = zipfile.ZipInfo(arcname, date_time=manifest["date_time"])
+                zinfo.create_system = 3  # Unix, so external_attr holds the mode
+                zinfo.external_attr = (0o100000 | entry["mode"]) << 16
+
+                old = reusable(arcname)
+                if old is not None:
+                    zinfo.compress_type = old.compress_type
+                    zinfo.CRC = old.CRC
+                    zinfo.file_size = old.file_size
+                    if old.compress_type == zipfile.ZIP_DEFLATED and raw_writes:
+                        write_raw_member(zipf, zinfo, read_raw_member(old_zip.fp, old))
+                    else:
+                        zipf.writestr(zinfo, old_zip.read(old), compress_type=old.compress_type, compresslevel=level)
+                    counts["reused"] += 1
+                    report(index, f"  Reused: {arcname}")
+                else:
+                    zinfo.compress_type, zinfo.CRC, zinfo.file_size, payload = pending.pop(arcname).result()
+                    submit_ahead()
+                    write_member(zipf, zinfo, payload, level, raw_writes)
+                    counts["added"] += 1
+                    if zinfo.compress_type == zipfile.ZIP_STORED:
+                        counts["stored"] += 1
+                        report(index, f"  Added: {arcname} (stored)")
+                    else:
+                        report(index, f"  Added: {arcname} (deflated {100 - 100 * zinfo.compress_size // max(1, zinfo.file_size)}%)")
+    finally:
+        if old_zip:
+            old_zip.close()
+
+    if show_progress:
+        print()
+    if verbosity != "quiet":
+        print(f"  {len(files)} files: {counts['added']} compressed ({counts['stored']} stored as-is), "
+              f"{counts['reused']} reused from the previous build")
+
+    os.replace(tmp_filename, skill_filename)
+
+
+def package_skill_quietly(skill_path, output_dir, level=DEFAULT_LEVEL, threads=None, verbosity="progress"):
+    """
+    Package one skill in a worker process, capturing its output.
+
+    Returns:
+        (skill name, path to the .skill file or None, seconds taken, captured output)
+    """
+    start = time.perf_counter()
+    output = io.StringIO()
+    with redirect_stdout(output), span(f"package {Path(skill_path).name}") as s:
+        try:
+            result = package_skill(skill_path, output_dir, level, threads, verbosity)
+        except Exception as e:
+            print(f"❌ Error packaging skill: {e}")
+            result = None
+        if result is None:
+            s.error("packaging failed")
+    # Worker processes exit without running atexit handlers
+    flush()
+    return Path(skill_path).name, result, time.perf_counter() - start, output.getvalue()
+
+
+def find_skills(skills_root):
+    """Return every directory directly under skills_root that contains a SKILL.md."""
+    return sorted(p for p in Path(skills_root).iterdir() if (p / "SKILL.md").is_file())
+
+
+def package_all(skills_root, output_dir=None, jobs=None, level=DEFAULT_LEVEL, threads=None, verbosity="progress"):
+    """
+    Validate and package every skill under skills_root in a process pool.
+
+    Args:
+        skills_root: Directory containing skill folders
+        output_dir: Optional output directory for the .skill files
+        jobs: Number of worker processes (defaults to the CPU count)
+        level: Deflate level 0-9
+        threads: Compression threads per worker process (defaults to the
+            CPUs divided between the workers, so the total stays near the CPU count)
+        verbosity: Output level for each skill's captured log (see package_skill)
+
+    Returns:
+        True if every skill was packaged successfully
+    """
+    skills_root = Path(skills_root)
+    if not skills_root.is_dir():
+        print(f"❌ Error: Skills root is not a directory: {skills_root}")
+        return False
+
+    skills = find_skills(skills_root)
+    if not skills:
+        print(f"❌ Error: No skills (folders with SKILL.md) found in {skills_root}")
+        return False
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    cpus = os.cpu_count() or 1
+    workers = min(jobs or cpus, len(skills))
+    if threads is None:
+        threads = max(1, cpus // workers)
+
+    results = []
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(package_skill_quietly, skill, output_dir, level, threads, verbosity) for skill in skills]
+        # Report skills as they finish so small ones are not held up by large ones
+        for future in as_completed(futures):
+            name, result, elapsed, output = future.result()
+            results.append((name, result, elapsed, output))
+            status = "✅" if result else "❌"
+            print(f"{status} {name} ({elapsed:.2f}s)")
+            if not result:
+                print("   " + output.strip().replace("\n", "\n   "))
+    total = time.perf_counter() - start
+
+    print(f"\n{'Skill':<32} {'Size':>12} {'Time':>8}")
+    for name, result, elapsed, _ in sorted(results):
+        size = f"{result.stat().st_size:,} B" if result else "failed"
+        print(f"{name:<32} {size:>12} {elapsed:>7.2f}s")
+
+    failed = [name for name, result, _, _ in results if not result]
+    if failed:
+        print(f"\n❌ {len(failed)} of {len(results)} skills failed: {', '.join(sorted(failed))}")
+        return False
+
+    print(f"\n✅ Packaged {len(results)} skills in {total:.2f}s")
+    return True
+
+
 def main():
-    if len(sys.argv) < 2:
-        print("Usage: python utils/package_skill.py <path/to/skill-folder> [output-directory]")
-        print("\nExample:")
-        print("  python utils/package_skill.py skills/public/my-skill")
-        print("  python utils/package_skill.py skills/public/my-skill ./dist")
-        sys.exit(1)
+    parser = argparse.ArgumentParser(
+        description="Package a skill folder into a distributable .skill file",
+        epilog="""Example:
+  python utils/package_skill.py skills/public/my-skill
+  python utils/package_skill.py skills/public/my-skill ./dist
+  python utils/package_skill.py --all skills/public ./dist""",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("path", help="Skill folder, or the skills root with --all")
+    parser.add_argument("output_dir", nargs="?", help="Output directory (defaults to the current directory)")
+    parser.add_argument("--all", action="store_true",
+                        help="Package every skill folder under the given root in parallel")
+    parser.add_argument("--jobs", "-j", type=int, default=None,
+                        help="Worker processes for --all (defaults to the CPU count)")
+    parser.add_argument("--level", "-l", type=int, choices=range(10), default=DEFAULT_LEVEL, metavar="0-9",
+                        help=f"Deflate level (default: {DEFAULT_LEVEL}; 0 stores files uncompressed)")
+    parser.add_argument("--threads", "-t", type=int, default=None,
+                        help="Threads used to compress files (defaults to the CPU count; "
+                             "with --all, the CPUs divided between the worker processes)")
+    verbosity = parser.add_mutually_exclusive_group()
+    verbosity.add_argument("--verbose", "-v", action="store_const", const="verbose", dest="verbosity",
+                           help="Print a line for every file added")
+    verbosity.add_argument("--quiet", "-q", action="store_const", const="quiet", dest="verbosity",
+                           help="Only print the result")
+    parser.set_defaults(verbosity="progress")
+    args = parser.parse_args()
 
-    skill_path = sys.argv[1]
-    output_dir = sys.argv[2] if len(sys.argv) > 2 else None
+    if args.all:
+        print(f"📦 Packaging all skills in: {args.path}")
+        if args.output_dir:
+            print(f"   Output directory: {args.output_dir}")
+        print()
+        sys.exit(0 if package_all(args.path, args.output_dir, args.jobs, args.level, args.threads, args.verbosity) else 1)
 
-    print(f"📦 Packaging skill: {skill_path}")
-    if output_dir:
-        print(f"   Output directory: {output_dir}")
+    print(f"📦 Packaging skill: {args.path}")
+    if args.output_dir:
+        print(f"   Output directory: {args.output_dir}")
     print()
 
-    result = package_skill(skill_path, output_dir)
+    result = package_skill(args.path, args.output_dir, args.level, args.threads, args.verbosity)
 
     if result:
         sys.exit(0)
@@ -107,4 +536,5 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    with span("package_skill"):
+        main()
@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+Skill footprint profiler - how much context and disk a skill costs
+
+Reports bytes, line counts and approximate token counts per file and per
+directory, separating what is always loaded (the frontmatter name and
+description), what is loaded when the skill triggers (SKILL.md) and what is
+only read on demand (references/, scripts/, assets/). Files excluded by
+.skillignore are not counted.
+
+Usage:
+    python profile_skill.py <skill_directory>
+    python profile_skill.py --all <skills_root>
+    python profile_skill.py --all <skills_root> --json > footprint.json
+
+Token counts are estimates (about 4 characters per token for text files);
+binary files count towards disk size only.
+"""
+
+import sys
+import json
+import argparse
+from pathlib import Path
+from quick_validate import read_frontmatter, parse_frontmatter, FrontmatterError
+from skillignore import walk_files
+
+CHARS_PER_TOKEN = 4
+# Thresholds for flagging the parts of a skill that are loaded eagerly
+MAX_DESCRIPTION_TOKENS = 256
+MAX_SKILL_MD_TOKENS = 5000
+MAX_SKILL_MD_LINES = 500
+
+
+def estimate_tokens(chars):
+    return (chars + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def profile_file(path):
+    """
+    Size a single file.
+
+    Returns:
+        dict with bytes, and lines/tokens for text files (None for binary)
+    """
+    data = path.read_bytes()
+    stats = {"bytes": len(data), "lines": None, "tokens": None}
+    if b'\0' in data[:8192]:
+        return stats
+    try:
+        text = data.decode('utf-8')
+    except UnicodeDecodeError:
+        return stats
+    stats["lines"] = text.count('\n') + (1 if text and not text.endswith('\n') else 0)
+    stats["tokens"] = estimate_tokens(len(text))
+    return stats
+
+
+def profile_skill(skill_path, depth=2):
+    """
+    Profile one skill folder.
+
+    Args:
+        skill_path: Path to the skill folder
+        depth: Directory depth to aggregate totals at
+
+    Returns:
+        dict describing the skill's footprint (see --json output)
+    """
+    skill_path = Path(skill_path)
+    files = []
+    directories = {}
+    totals = {"files": 0, "bytes": 0, "lines": 0, "tokens": 0}
+
+    for relpath, file_path in walk_files(skill_path):
+        stats = profile_file(file_path)
+        files.append(dict(stats, path=relpath))
+
+        totals["files"] += 1
+        for key in ("bytes", "lines", "tokens"):
+            totals[key] += stats[key] or 0
+
+        # Aggregate into every ancestor directory down to the requested depth
+        parts = relpath.split('/')[:-1]
+        for level in range(1, min(len(parts), depth) + 1):
+            directory = '/'.join(parts[:level]) + '/'
+            entry = directories.setdefault(directory, {"files": 0, "bytes": 0, "lines": 0, "tokens": 0})
+            entry["files"] += 1
+            for key in ("bytes", "lines", "tokens"):
+                entry[key] += stats[key] or 0
+
+    skill_md = next((f for f in files if f["path"] == "SKILL.md"), None)
+
+    always_loaded = 0
+    # A SKILL.md that is not UTF-8 (lines is None) has no readable frontmatter
+    if skill_md and skill_md["lines"] is not None:
+        text, error = read_frontmatter(skill_path / "SKILL.md")
+        try:
+            frontmatter = parse_frontmatter(text) if text is not None else None
+        except (FrontmatterError, ImportError):
+            frontmatter = None
+        if isinstance(frontmatter, dict):
+            always_loaded = estimate_tokens(len(str(frontmatter.get("name") or ""))
+                                            + len(str(frontmatter.get("description") or "")))
+        elif text is not None:
+            # Unparseable frontmatter: count all of it
+            always_loaded = estimate_tokens(len(text))
+
+    warnings = []
+    if always_loaded > MAX_DESCRIPTION_TOKENS:
+        warnings.append(f"name + description is ~{always_loaded} tokens (always loaded; keep under {MAX_DESCRIPTION_TOKENS})")
+    if skill_md and (skill_md["tokens"] or 0) > MAX_SKILL_MD_TOKENS:
+        warnings.append(f"SKILL.md is ~{skill_md['tokens']:,} tokens (loaded on trigger; keep under {MAX_SKILL_MD_TOKENS:,})")
+    if skill_md and (skill_md["lines"] or 0) > MAX_SKILL_MD_LINES:
+        warnings.append(f"SKILL.md has {skill_md['lines']} lines (keep under {MAX_SKILL_MD_LINES})")
+
+    return {
+        "name": skill_path.name,
+        "always_loaded_tokens": always_loaded,
+        "skill_md": {k: v for k, v in skill_md.items() if k != "path"} if skill_md else None,
+        "totals": totals,
+        "directories": dict(sorted(directories.items())),
+        "files": files,
+        "warnings": warnings,
+    }
+
+
+def format_size(n):
+    for unit in ("B", "KiB", "MiB"):
+        if n < 1024 or unit == "MiB":
+            return f"{n:,.0f} {unit}" if unit == "B" else f"{n:,.1f} {unit}"
+        n /= 1024
+
+
+def print_profile(profile, top):
+    totals = profile["totals"]
+    skill_md = profile["skill_md"]
+    print(f"📏 {profile['name']}")
+    print(f"   Always loaded (name + description): ~{profile['always_loaded_tokens']:,} tokens")
+    if skill_md:
+        if skill_md["lines"] is not None:
+            print(f"   SKILL.md: {format_size(skill_md['bytes'])}, {skill_md['lines']:,} lines, "
+                  f"~{skill_md['tokens']:,} tokens")
+        else:
+            print(f"   SKILL.md: {format_size(skill_md['bytes'])}, not UTF-8 text")
+    print(f"   Total: {totals['files']:,} files, {format_size(totals['bytes'])}, "
+          f"{totals['lines']:,} lines, ~{totals['tokens']:,} tokens")
+
+    if profile["directories"]:
+        print("\n   By directory:")
+        for directory, entry in profile["directories"].items():
+            indent = "  " * (directory.count('/') - 1)
+            print(f"     {indent + directory:<40} {entry['files']:>6,} files {format_size(entry['bytes']):>12} "
+                  f"~{entry['tokens']:>10,} tokens")
+
+    largest = sorted(profile["files"], key=lambda f: f["bytes"], reverse=True)[:top]
+    if largest:
+        print("\n   Largest files:")
+        for f in largest:
+            tokens = f"~{f['tokens']:,} tokens" if f["tokens"] is not None else "binary"
+            print(f"     {f['path']:<52} {format_size(f['bytes']):>12}  {tokens}")
+
+    for warning in profile["warnings"]:
+        print(f"   ⚠️  {warning}")
+    print()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Report how much context and disk a skill costs",
+        epilog="""Examples:
+  python profile_skill.py skills/my-skill
+  python profile_skill.py --all skills --top 5
+  python profile_skill.py --all skills --json > footprint.json""",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("path", help="Skill folder, or the skills root with --all")
+    parser.add_argument("--all", action="store_true", help="Profile every skill folder under path")
+    parser.add_argument("--depth", "-d", type=int, default=2,
+                        help="Directory depth to aggregate totals at (default: 2)")
+    parser.add_argument("--top", "-n", type=int, default=10,
+                        help="Number of largest files to list per skill (default: 10)")
+    parser.add_argument("--json", "-j", action="store_true", help="Output the full profile as JSON")
+    args = parser.parse_args()
+
+    root = Path(args.path)
+    if args.all:
+        if not root.is_dir():
+            print(f"❌ Error: Skills root is not a directory: {root}")
+            sys.exit(1)
+        skills = sorted(p for p in root.iterdir() if (p / "SKILL.md").is_file())
+    elif (root / "SKILL.md").is_file():
+        skills = [root]
+    else:
+        print(f"❌ Error: SKILL.md not found in {root} (use --all for a directory of skills)")
+        sys.exit(1)
+
+    profiles = [profile_skill(skill, args.depth) for skill in skills]
+
+    if args.json:
+        print(json.dumps({"skills": profiles}, indent=2))
+        return
+
+    for profile in profiles:
+        print_profile(profile, args.top)
+
+    if len(profiles) > 1:
+        print(f"{'Skill':<32} {'Always':>8} {'SKILL.md':>10} {'Total tokens':>14} {'Disk':>12}")
+        for profile in sorted(profiles, key=lambda p: p["totals"]["bytes"], reverse=True):
+            skill_md_tokens = profile["skill_md"]["tokens"] if profile["skill_md"] else 0
+            print(f"{profile['name']:<32} {profile['always_loaded_tokens']:>8,} {skill_md_tokens or 0:>10,} "
+                  f"{profile['totals']['tokens']:>14,} {format_size(profile['totals']['bytes']):>12}")
+
+
+if __name__ == "__main__":
+    main()
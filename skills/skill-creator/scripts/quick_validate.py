@@ -1,14 +1,213 @@
 #!/usr/bin/env python3
 """
 Quick validation script for skills - minimal version
+
+Usage:
+    python quick_validate.py <skill_directory>
+    python quick_validate.py --all <skills_root>    # Every skill, plus links and file sizes
 """
 
 import sys
 import os
 import re
-import yaml
+import json
+import hashlib
+import argparse
 from pathlib import Path
 
+# Built-in parser for the frontmatter subset skills use: top-level
+# `key: value` pairs with plain, quoted or flow-list scalars, plus one level
+# of nested list/mapping (allowed-tools, metadata). Anything else falls
+# back to PyYAML, which is only imported when needed.
+KEY_RE = re.compile(r'^([A-Za-z_][\w.-]*):(?:[ \t]+(.*))?$')
+SINGLE_QUOTED_RE = re.compile(r"^'((?:[^']|'')*)'\s*(?:#.*)?$")
+DOUBLE_QUOTED_RE = re.compile(r'^"([^"\\]*)"\s*(?:#.*)?$')
+FLOW_LIST_RE = re.compile(r'^\[([^\[\]{}"\']*)\]\s*(?:#.*)?$')
+INT_RE = re.compile(r'^[-+]?(?:0|[1-9][0-9_]*)$')
+FLOAT_RE = re.compile(r'^[-+]?(?:[0-9][0-9_]*)?\.[0-9_]+(?:[eE][-+][0-9]+)?$')
+# YAML 1.1 scalars, as resolved by PyYAML's safe_load
+NULLS = {'', '~', 'null', 'Null', 'NULL'}
+BOOLS = {v: True for v in ('yes', 'Yes', 'YES', 'true', 'True', 'TRUE', 'on', 'On', 'ON')}
+BOOLS.update({v: False for v in ('no', 'No', 'NO', 'false', 'False', 'FALSE', 'off', 'Off', 'OFF')})
+
+
+class FrontmatterError(ValueError):
+    """Frontmatter that is not valid YAML."""
+
+
+class NeedsYaml(Exception):
+    """Frontmatter uses YAML beyond the built-in subset."""
+
+
+def read_frontmatter(skill_md):
+    """
+    Read the YAML text between the opening and closing `---` lines, without
+    reading the rest of the file.
+
+    Returns:
+        (frontmatter text, None) or (None, error message)
+    """
+    with open(skill_md, encoding='utf-8') as f:
+        first = f.readline()
+        if not first.startswith('---'):
+            return None, "No YAML frontmatter found"
+        if first.rstrip('\r\n') != '---':
+            return None, "Invalid frontmatter format"
+        lines = []
+        for line in f:
+            if line.startswith('---'):
+                return ''.join(lines), None
+            lines.append(line)
+    return None, "Invalid frontmatter format"
+
+
+def parse_scalar(text):
+    """Resolve a plain scalar the way YAML 1.1 does, for the unambiguous cases."""
+    if text in NULLS:
+        return None
+    if text in BOOLS:
+        return BOOLS[text]
+    if INT_RE.match(text):
+        return int(text.replace('_', ''))
+    if FLOAT_RE.match(text):
+        return float(text.replace('_', ''))
+    if text[0] in '0123456789+-.' or text.startswith('<<'):
+        # Dates, octal/hex/sexagesimal numbers, .inf ... leave to PyYAML
+        raise NeedsYaml
+    return text
+
+
+def parse_value(value, continuation, lineno):
+    """Parse an inline value plus any more-indented continuation lines."""
+    if value[0] in '|>{&*!%@`,?' or value.startswith('- '):
+        raise NeedsYaml
+    if value[0] in '\'"[':
+        if continuation:
+            raise NeedsYaml
+        match = SINGLE_QUOTED_RE.match(value)
+        if match:
+            return match.group(1).replace("''", "'")
+        match = DOUBLE_QUOTED_RE.match(value)
+        if match:
+            return match.group(1)
+        match = FLOW_LIST_RE.match(value)
+        if match:
+            items = [item.strip() for item in match.group(1).split(',')]
+            if items == ['']:
+                return []
+            if '' in items or any(': ' in item or item.endswith(':') for item in items):
+                raise NeedsYaml
+            return [parse_scalar(item) for item in items]
+        raise NeedsYaml
+
+    # Plain scalar, possibly folded over several lines; ' #' starts a comment
+    parts = [value] + continuation
+    for index, part in enumerate(parts):
+        if not part or part.startswith('#'):
+            # Blank lines fold into newlines; comments end the scalar
+            raise NeedsYaml
+        comment = re.search(r'[ \t]#', part)
+        if comment:
+            if index != len(parts) - 1:
+                raise NeedsYaml
+            parts[index] = part[:comment.start()].strip()
+    text = ' '.join(parts)
+    if ': ' in text or '\t:' in text or text.endswith(':'):
+        raise FrontmatterError(f"mapping values are not allowed here (line {lineno})")
+    return parse_scalar(text)
+
+
+def parse_block(block, lineno):
+    """Parse the indented lines under a key with no inline value: a list or a mapping."""
+    indent = len(block[0]) - len(block[0].lstrip(' '))
+    items = [line[indent:] for line in block]
+    if any(item[:1] in (' ', '\t') for item in items):
+        # Deeper nesting or inconsistent indentation
+        raise NeedsYaml
+
+    if all(item == '-' or item.startswith('- ') for item in items):
+        return [parse_value(item[2:].strip(), [], lineno + i) if item[2:].strip() else None
+                for i, item in enumerate(items, 1)]
+
+    mapping = {}
+    for i, item in enumerate(items, 1):
+        match = KEY_RE.match(item.rstrip())
+        if not match:
+            raise NeedsYaml
+        value = (match.group(2) or '').strip()
+        mapping[match.group(1)] = parse_value(value, [], lineno + i) if value else None
+    return mapping
+
+
+def parse_simple_frontmatter(text):
+    """
+    Parse frontmatter in the built-in subset.
+
+    Raises:
+        NeedsYaml: the text uses YAML features outside the subset
+        FrontmatterError: the text is definitely invalid YAML
+    """
+    if '\t' in text:
+        raise NeedsYaml
+    lines = text.split('\n')
+    result = {}
+    i = 0
+    while i < len(lines):
+        line = lines[i].rstrip()
+        lineno = i + 1
+        i += 1
+        if not line or line.startswith('#'):
+            continue
+        if line[0] == ' ':
+            raise NeedsYaml
+        match = KEY_RE.match(line)
+        if not match:
+            raise NeedsYaml
+
+        # Collect the following blank or indented lines belonging to this key
+        block = []
+        while i < len(lines) and (not lines[i].strip() or lines[i][0] == ' '):
+            block.append(lines[i].rstrip())
+            i += 1
+        while block and not block[-1]:
+            block.pop()
+        block = [b for b in block if not b.strip().startswith('#')]
+
+        key, value = match.group(1), (match.group(2) or '').strip()
+        if value.startswith('#'):
+            value = ''
+        if value:
+            result[key] = parse_value(value, [b.strip() for b in block], lineno)
+        elif block:
+            if any(not b.strip() for b in block):
+                raise NeedsYaml
+            result[key] = parse_block(block, lineno)
+        else:
+            result[key] = None
+    return result or None
+
+
+def parse_frontmatter(text):
+    """
+    Parse SKILL.md frontmatter, using PyYAML only when the built-in subset
+    parser cannot handle it.
+
+    Raises:
+        FrontmatterError: invalid YAML
+        ImportError: PyYAML is needed but not installed
+    """
+    try:
+        return parse_simple_frontmatter(text)
+    except NeedsYaml:
+        pass
+
+    import yaml
+    try:
+        return yaml.safe_load(text)
+    except yaml.YAMLError as e:
+        raise FrontmatterError(str(e)) from e
+
+
 def validate_skill(skill_path):
     """Basic validation of a skill"""
     skill_path = Path(skill_path)
@@ -19,24 +218,19 @@ def validate_skill(skill_path):
         return False, "SKILL.md not found"
 
     # Read and validate frontmatter
-    content = skill_md.read_text()
-    if not content.startswith('---'):
-        return False, "No YAML frontmatter found"
-
-    # Extract frontmatter
-    match = re.match(r'^---\n(.*?)\n---', content, re.DOTALL)
-    if not match:
-        return False, "Invalid frontmatter format"
-
-    frontmatter_text = match.group(1)
+    frontmatter_text, error = read_frontmatter(skill_md)
+    if error:
+        return False, error
 
     # Parse YAML frontmatter
     try:
-        frontmatter = yaml.safe_load(frontmatter_text)
+        frontmatter = parse_frontmatter(frontmatter_text)
         if not isinstance(frontmatter, dict):
             return False, "Frontmatter must be a YAML dictionary"
-    except yaml.YAMLError as e:
+    except FrontmatterError as e:
         return False, f"Invalid YAML in frontmatter: {e}"
+    except ImportError:
+        return False, "Frontmatter uses YAML features that need PyYAML to validate; please install it"
 
     # Define allowed properties
     ALLOWED_PROPERTIES = {'name', 'description', 'license', 'allowed-tools', 'metadata'}
@@ -85,11 +279,251 @@ def validate_skill(skill_path):
 
     return True, "Skill is valid!"
 
-if __name__ == "__main__":
-    if len(sys.argv) != 2:
-        print("Usage: python quick_validate.py <skill_directory>")
+# Repository-wide checks (--all): these are reported as warnings, since
+# SKILL.md prose often names example paths and synced docs carry upstream
+# link rot. --strict turns them into failures.
+DEFAULT_MAX_FILE_SIZE = 1024 * 1024
+MAX_SKILL_MD_LINES = 500
+CACHE_VERSION = 2
+# Below this many changed markdown files, scanning inline beats starting a pool
+PARALLEL_THRESHOLD = 64
+
+INLINE_LINK_RE = re.compile(r'!?\[[^\]\n]*\]\(\s*<?([^)\s>]+)>?(?:\s+["\'(][^)]*)?\)')
+REF_DEF_RE = re.compile(r'^\s{0,3}\[[^\]]+\]:\s*<?([^\s>]+)>?')
+CODE_SPAN_RE = re.compile(r'`([^`\n]+)`')
+FENCE_RE = re.compile(r'^\s{0,3}(`{3,}|~{3,})(.*)$')
+SCHEME_RE = re.compile(r'^[a-zA-Z][a-zA-Z0-9+.-]*:')
+# `references/...`, `scripts/...`, `assets/...` (optionally `skills/<name>/...`) in SKILL.md
+RESOURCE_REF_RE = re.compile(r'^(?:\./)?(?:skills/[\w.-]+/)?((?:references|scripts|assets)/[^\s*<>\[\]{}]*)$')
+
+
+def scan_markdown(path, cached=None):
+    """
+    Read a markdown file and extract what the repository checks need.
+
+    Returns:
+        dict with sha256, line count, relative link targets as (line, target)
+        and, for SKILL.md, resource paths named in code spans
+    """
+    data = Path(path).read_bytes()
+    digest = hashlib.sha256(data).hexdigest()
+    if cached and cached.get('sha256') == digest:
+        return cached
+
+    text = data.decode('utf-8', errors='replace')
+    links = []
+    refs = []
+    fence = None
+    is_skill_md = Path(path).name == 'SKILL.md'
+    for lineno, line in enumerate(text.splitlines(), 1):
+        match = FENCE_RE.match(line)
+        if fence:
+            # Only a fence of the same character, at least as long and with no info string, closes the block
+            if (match and match.group(1)[0] == fence[0] and len(match.group(1)) >= len(fence)
+                    and not match.group(2).strip()):
+                fence = None
+            continue
+        if match:
+            fence = match.group(1)
+            continue
+        if is_skill_md:
+            for span in CODE_SPAN_RE.findall(line):
+                match = RESOURCE_REF_RE.match(span.strip())
+                if match:
+                    refs.append((lineno, match.group(1)))
+        line = CODE_SPAN_RE.sub('', line)
+        targets = INLINE_LINK_RE.findall(line)
+        ref_def = REF_DEF_RE.match(line)
+        if ref_def:
+            targets.append(ref_def.group(1))
+        for target in targets:
+            if SCHEME_RE.match(target) or target.startswith(('#', '/', '{{')):
+                continue
+            links.append((lineno, target))
+
+    return {
+        'sha256': digest,
+        'lines': text.count('\n') + 1,
+        'links': links,
+        'refs': refs,
+    }
+
+
+def _scan_entry(item):
+    path, cached = item
+    return scan_markdown(path, cached)
+
+
+def default_cache_path(skills_root):
+    """Per-root cache file under $XDG_CACHE_HOME/skill-validate."""
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.expanduser('~/.cache')
+    key = hashlib.sha256(str(Path(skills_root).resolve()).encode('utf-8')).hexdigest()[:16]
+    return Path(base) / 'skill-validate' / f'{key}.json'
+
+
+def load_cache(cache_path):
+    try:
+        cache = json.loads(Path(cache_path).read_text())
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(cache, dict) or cache.get('version') != CACHE_VERSION:
+        return {}
+    return cache.get('files', {})
+
+
+def save_cache(cache_path, files):
+    cache_path = Path(cache_path)
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = cache_path.with_name(cache_path.name + '.tmp')
+        tmp.write_text(json.dumps({'version': CACHE_VERSION, 'files': files}))
+        os.replace(tmp, cache_path)
+    except OSError:
+        pass
+
+
+def link_target_path(md_path, target):
+    """Filesystem path a relative markdown link points at."""
+    from urllib.parse import unquote
+    target = unquote(target.split('#', 1)[0].split('?', 1)[0])
+    if not target:
+        return None
+    return os.path.normpath(os.path.join(os.path.dirname(md_path), target))
+
+
+def validate_all(skills_root, max_file_size=DEFAULT_MAX_FILE_SIZE, cache_path=None, jobs=None):
+    """
+    Validate every skill under skills_root: SKILL.md frontmatter, plus
+    broken relative links between markdown files, oversized files and
+    resource paths named in SKILL.md that do not exist.
+
+    Markdown files are scanned in a process pool; scan results are cached by
+    (mtime, size, sha256) so unchanged files are not re-read.
+
+    Returns:
+        List of (skill name, error message or None, [warnings])
+    """
+    # Imported here so single-skill validation (and package_skill) starts fast
+    from concurrent.futures import ProcessPoolExecutor
+    from skillignore import walk_files
+
+    skills_root = Path(skills_root)
+    skills = sorted(p for p in skills_root.iterdir() if (p / 'SKILL.md').is_file())
+
+    cache = load_cache(cache_path) if cache_path else {}
+    new_cache = {}
+
+    # Walk every skill (pruning ignored directories) and stat its files
+    skill_files = {}
+    existing = set()
+    to_scan = []
+    for skill in skills:
+        files = []
+        for relpath, file_path in walk_files(skill):
+            path = str(file_path)
+            st = file_path.stat()
+            files.append((relpath, path, st.st_size))
+            existing.add(path)
+            existing.update(str(parent) for parent in file_path.parents)
+            if path.endswith('.md'):
+                cached = cache.get(path)
+                if cached and cached.get('mtime_ns') == st.st_mtime_ns and cached.get('size') == st.st_size:
+                    new_cache[path] = cached
+                else:
+                    to_scan.append((path, st, cached))
+        skill_files[skill] = files
+
+    # Only changed markdown files are read; a touched but identical file keeps its cached scan
+    items = [(path, cached) for path, _, cached in to_scan]
+    if len(items) >= PARALLEL_THRESHOLD:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            scanned = list(pool.map(_scan_entry, items, chunksize=32))
+    else:
+        scanned = [_scan_entry(item) for item in items]
+    for (path, st, _), result in zip(to_scan, scanned):
+        new_cache[path] = dict(result, mtime_ns=st.st_mtime_ns, size=st.st_size)
+
+    if cache_path:
+        save_cache(cache_path, new_cache)
+
+    def exists(path):
+        return path in existing or os.path.exists(path)
+
+    results = []
+    for skill in skills:
+        valid, message = validate_skill(skill)
+        warnings = []
+        for relpath, path, size in skill_files[skill]:
+            if size > max_file_size:
+                warnings.append(f"{relpath}: oversized file ({size:,} bytes > {max_file_size:,})")
+            scan = new_cache.get(path)
+            if not scan:
+                continue
+            if relpath == 'SKILL.md':
+                if scan['lines'] > MAX_SKILL_MD_LINES:
+                    warnings.append(f"SKILL.md: {scan['lines']} lines (keep it under {MAX_SKILL_MD_LINES})")
+                for lineno, ref in scan['refs']:
+                    if not exists(os.path.normpath(os.path.join(skill, ref))):
+                        warnings.append(f"SKILL.md:{lineno}: referenced file does not exist: {ref}")
+            for lineno, target in scan['links']:
+                target_path = link_target_path(path, target)
+                if target_path and not exists(target_path):
+                    warnings.append(f"{relpath}:{lineno}: broken link: {target}")
+        results.append((skill.name, None if valid else message, warnings))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Validate a skill, or every skill under a directory with --all",
+        epilog="""Examples:
+  python quick_validate.py skills/my-skill
+  python quick_validate.py --all skills
+  python quick_validate.py --all skills --strict --max-size 500000""",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("path", help="Skill directory, or the skills root with --all")
+    parser.add_argument("--all", action="store_true",
+                        help="Validate every skill under path, including links and file sizes in its resources")
+    parser.add_argument("--strict", action="store_true",
+                        help="With --all, fail on warnings too")
+    parser.add_argument("--max-size", type=int, default=DEFAULT_MAX_FILE_SIZE,
+                        help=f"With --all, warn about files larger than this many bytes (default: {DEFAULT_MAX_FILE_SIZE})")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="With --all, do not read or write the scan cache")
+    parser.add_argument("--jobs", "-j", type=int, default=None,
+                        help="With --all, worker processes for scanning (defaults to the CPU count)")
+    args = parser.parse_args()
+
+    if not args.all:
+        valid, message = validate_skill(args.path)
+        print(message)
+        sys.exit(0 if valid else 1)
+
+    if not Path(args.path).is_dir():
+        print(f"❌ Error: Skills root is not a directory: {args.path}")
         sys.exit(1)
-    
-    valid, message = validate_skill(sys.argv[1])
-    print(message)
-    sys.exit(0 if valid else 1)
\ No newline at end of file
+
+    cache_path = None if args.no_cache else default_cache_path(args.path)
+    results = validate_all(args.path, args.max_size, cache_path, args.jobs)
+
+    failed = 0
+    warned = 0
+    for name, error, warnings in results:
+        if error:
+            failed += 1
+            print(f"❌ {name}: {error}")
+        elif warnings:
+            print(f"⚠️  {name}: {len(warnings)} warning(s)")
+        else:
+            print(f"✅ {name}")
+        warned += bool(warnings)
+        for warning in warnings:
+            print(f"   {warning}")
+
+    print(f"\n{len(results)} skills: {failed} invalid, {warned} with warnings")
+    sys.exit(1 if failed or (args.strict and warned) else 0)
+
+
+if __name__ == "__main__":
+    main()
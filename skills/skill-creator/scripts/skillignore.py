@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+.skillignore support - gitignore-style exclusion rules for skill folders
+
+A skill folder may contain a .skillignore file using gitignore syntax
+(comments, blank lines, `!` negation, trailing `/` for directories, leading
+`/` to anchor at the skill root, `*`, `?`, `[...]` and `**`). Its rules are
+applied after DEFAULT_IGNORE, so they can re-include files ignored by
+default. Ignored directories are pruned during the walk and never descended
+into.
+
+Usage:
+    python skillignore.py <skill_directory>    # List the files that would be packaged
+"""
+
+import os
+import re
+import sys
+from pathlib import Path
+
+IGNORE_FILENAME = '.skillignore'
+
+# Always-ignored build, VCS and editor artifacts
+DEFAULT_IGNORE = [
+    '.git/',
+    '.hg/',
+    '.svn/',
+    '__pycache__/',
+    '*.py[cod]',
+    '.pytest_cache/',
+    '.mypy_cache/',
+    '.ruff_cache/',
+    '.venv/',
+    'node_modules/',
+    '.DS_Store',
+    'Thumbs.db',
+    '*.swp',
+    '*.swo',
+    '*~',
+    '.#*',
+    '*.skill',
+    '*.skill.tmp',
+    '*.skill.manifest.json',
+    '/' + IGNORE_FILENAME,
+]
+
+
+def translate_glob(pattern):
+    """
+    Translate a gitignore glob (without leading/trailing slashes) to a regex.
+
+    As in git and fnmatch, a `]` right after `[` or `[!` is part of the set,
+    and a `[` without a closing `]` matches itself:
+
+    >>> [bool(re.fullmatch(translate_glob(p), name)) for p, name in
+    ...  [('[]', '[]'), ('x[!]', 'x[!]'), ('[]a]', ']'), ('[]a]', 'a'), ('a[b', 'a[b'), ('[!a]', 'b')]]
+    [True, True, True, True, True, True]
+    """
+    i, n = 0, len(pattern)
+    out = []
+    while i < n:
+        c = pattern[i]
+        if c == '*':
+            if pattern[i:i + 3] == '**/':
+                out.append('(?:.*/)?')
+                i += 3
+                continue
+            if pattern[i:i + 2] == '**':
+                out.append('.*')
+                i += 2
+                continue
+            out.append('[^/]*')
+        elif c == '?':
+            out.append('[^/]')
+        elif c == '[':
+            j = i + 1
+            if pattern[j:j + 1] in ('!', '^'):
+                j += 1
+            if pattern[j:j + 1] == ']':
+                j += 1
+            j = pattern.find(']', j)
+            if j == -1:
+                out.append(re.escape(c))
+            else:
+                body = pattern[i + 1:j]
+                negate = body[0] in '!^'
+                if negate:
+                    body = body[1:]
+                body = body.replace('\\', '\\\\').replace('[', '\\[').replace(']', '\\]')
+                out.append('[' + ('^' if negate else '') + body + ']')
+                i = j
+        elif c == '\\' and i + 1 < n:
+            i += 1
+            out.append(re.escape(pattern[i]))
+        else:
+            out.append(re.escape(c))
+        i += 1
+    return ''.join(out)
+
+
+def compile_rule(line):
+    """
+    Compile one gitignore line.
+
+    Returns:
+        (regex, negate, dir_only), or None for blank lines and comments
+    """
+    line = line.rstrip('\n')
+    # Trailing spaces are ignored unless escaped
+    stripped = line.rstrip(' ')
+    if stripped.endswith('\\') and len(stripped) < len(line):
+        stripped += ' '
+    line = stripped
+    if not line or line.startswith('#'):
+        return None
+
+    negate = line.startswith('!')
+    if negate:
+        line = line[1:]
+    elif line.startswith('\\'):
+        line = line[1:]
+
+    dir_only = line.endswith('/')
+    line = line.rstrip('/')
+    if not line:
+        return None
+
+    # A slash anywhere but the end anchors the pattern at the skill root
+    anchored = '/' in line
+    line = line.lstrip('/')
+    prefix = '' if anchored else '(?:.*/)?'
+    return re.compile(prefix + translate_glob(line) + '$', re.DOTALL), negate, dir_only
+
+
+def load_rules(skill_path):
+    """Default rules followed by the skill's .skillignore, if present."""
+    lines = list(DEFAULT_IGNORE)
+    ignore_file = Path(skill_path) / IGNORE_FILENAME
+    if ignore_file.is_file():
+        lines.extend(ignore_file.read_text(encoding='utf-8').splitlines())
+    return [rule for rule in map(compile_rule, lines) if rule]
+
+
+def is_ignored(rules, relpath, is_dir):
+    """Whether a path (posix, relative to the skill root) is ignored. The last matching rule wins."""
+    ignored = False
+    for regex, negate, dir_only in rules:
+        if dir_only and not is_dir:
+            continue
+        if regex.match(relpath):
+            ignored = not negate
+    return ignored
+
+
+def walk_files(skill_path, rules=None):
+    """
+    Return (relpath, path) for every non-ignored file under skill_path,
+    pruning ignored directories instead of descending into them.
+    Results are sorted by relpath.
+    """
+    skill_path = Path(skill_path)
+    if rules is None:
+        rules = load_rules(skill_path)
+
+    found = []
+    for dirpath, dirnames, filenames in os.walk(skill_path):
+        rel_dir = Path(dirpath).relative_to(skill_path).as_posix()
+        rel_dir = '' if rel_dir == '.' else rel_dir + '/'
+        dirnames[:] = [d for d in dirnames if not is_ignored(rules, rel_dir + d, True)]
+        for name in filenames:
+            relpath = rel_dir + name
+            path = Path(dirpath) / name
+            if not is_ignored(rules, relpath, False) and path.is_file():
+                found.append((relpath, path))
+    return sorted(found)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        print("Usage: python skillignore.py <skill_directory>")
+        sys.exit(1)
+
+    for relpath, _ in walk_files(sys.argv[1]):
+        print(relpath)
@@ -1,3 +1,3 @@
 #!/usr/bin/env bash
 # (。・ω・。)ノ Sync all resources using the python script
-nix run nixpkgs#python3 -- "$(dirname "$0")/scripts/sync_resources.py"
+nix run nixpkgs#python3 -- "$(dirname "$0")/scripts/sync_resources.py" "$@"